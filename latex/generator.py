@@ -1,4 +1,5 @@
 """Generate themed LaTeX documents from text content"""
+import functools
 import logging
 from pathlib import Path
 from typing import Dict, Optional
@@ -239,10 +240,15 @@ def convert_markdown_to_latex(text: str) -> str:
     return text
 
 
+@functools.lru_cache(maxsize=64)
 def format_raw_text_for_latex(text: str) -> str:
     """
     Apply basic formatting to raw text when LLM is unavailable.
 
+    Memoized: the formatter is a pure function of its input, and the same
+    content is commonly formatted more than once per process (e.g. a
+    preview call followed by generate_themed_latex on the same note).
+
     Handles:
     - Bullet lists (-, *, •)
     - Numbered lists (1., 2., etc.)
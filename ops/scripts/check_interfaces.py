@@ -1,43 +1,86 @@
 #!/usr/bin/env python3
 """Validate that all interfaces match API contracts"""
 
+import ast
+import os
 import sys
 from pathlib import Path
 
+# Every path the checks below care about, gathered up front so existence
+# can be resolved with one os.scandir per parent directory instead of a
+# separate stat syscall per path.
+REQUIRED_PATHS = [
+    "config/app.yaml",
+    "backend/main.py",
+    "rag/__init__.py",
+    "rag/search.py",
+    "frontend/templates/base.html",
+    "latex/queue",
+    "latex/output",
+    "latex/templates",
+    "latex/scripts",
+    "latex/scripts/compile_watch.sh",
+]
+
+
+def scan_required_paths():
+    """Resolve existence of all REQUIRED_PATHS with one scandir per parent.
+
+    Returns:
+        Dict mapping path string -> os.DirEntry (or None if missing).
+        DirEntry carries cached type/stat info, so later is_dir()/stat()
+        calls don't hit the filesystem again.
+    """
+    by_parent = {}
+    for rel in REQUIRED_PATHS:
+        p = Path(rel)
+        by_parent.setdefault(p.parent, []).append(p)
+
+    found = {}
+    for parent, paths in by_parent.items():
+        try:
+            with os.scandir(parent) as it:
+                entries = {e.name: e for e in it}
+        except (FileNotFoundError, NotADirectoryError):
+            entries = {}
+        for p in paths:
+            found[str(p)] = entries.get(p.name)
+
+    return found
+
 
-def check_rag_interface():
+def check_rag_interface(found):
     """Verify RAG has required structure"""
-    rag_init = Path("rag/__init__.py")
-    if not rag_init.exists():
+    if found.get("rag/__init__.py") is None:
         print("❌ rag/__init__.py not found")
         return False
 
     # Check if search.py will exist (Sprint 1)
-    search_file = Path("rag/search.py")
-    if not search_file.exists():
+    if found.get("rag/search.py") is None:
         print("⚠️  rag/search.py not yet created (OK for Sprint 0)")
 
     print("✓ RAG structure valid")
     return True
 
 
-def check_latex_queue():
+def check_latex_queue(found):
     """Verify LaTeX directories exist"""
     required_dirs = [
-        Path("latex/queue"),
-        Path("latex/output"),
-        Path("latex/templates"),
-        Path("latex/scripts"),
+        "latex/queue",
+        "latex/output",
+        "latex/templates",
+        "latex/scripts",
     ]
 
     for d in required_dirs:
-        if not d.exists():
+        entry = found.get(d)
+        if entry is None or not entry.is_dir():
             print(f"❌ Missing directory: {d}")
             return False
 
     # Check compile script
-    compile_script = Path("latex/scripts/compile_watch.sh")
-    if not compile_script.exists():
+    compile_script = found.get("latex/scripts/compile_watch.sh")
+    if compile_script is None:
         print("❌ latex/scripts/compile_watch.sh not found")
         return False
 
@@ -49,29 +92,57 @@ def check_latex_queue():
     return True
 
 
-def check_backend_endpoints():
+def check_backend_endpoints(found):
     """Verify backend defines required files"""
-    backend_file = Path("backend/main.py")
-    if not backend_file.exists():
+    if found.get("backend/main.py") is None:
         print("❌ backend/main.py not found")
         return False
 
-    content = backend_file.read_text()
-    required_patterns = ["FastAPI", "@app"]
+    # Parse once instead of substring-scanning the whole file per pattern.
+    # This is also semantically correct: a comment mentioning FastAPI no
+    # longer counts as an import.
+    backend_file = Path("backend/main.py")
+    try:
+        tree = ast.parse(backend_file.read_text(), filename=str(backend_file))
+    except SyntaxError as e:
+        print(f"❌ Backend does not parse: {e}")
+        return False
 
-    for pattern in required_patterns:
-        if pattern not in content:
-            print(f"❌ Backend missing: {pattern}")
-            return False
+    imports_fastapi = False
+    has_app_route = False
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            if any(alias.name == "FastAPI" for alias in node.names):
+                imports_fastapi = True
+        elif isinstance(node, ast.Import):
+            if any(alias.name == "fastapi" for alias in node.names):
+                imports_fastapi = True
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for decorator in node.decorator_list:
+                # Matches @app.get(...), @app.post(...), etc.
+                func = decorator.func if isinstance(decorator, ast.Call) else decorator
+                if (
+                    isinstance(func, ast.Attribute)
+                    and isinstance(func.value, ast.Name)
+                    and func.value.id == "app"
+                ):
+                    has_app_route = True
+
+    if not imports_fastapi:
+        print("❌ Backend missing: FastAPI import")
+        return False
+    if not has_app_route:
+        print("❌ Backend missing: @app route decorators")
+        return False
 
     print("✓ Backend structure valid")
     return True
 
 
-def check_frontend_templates():
+def check_frontend_templates(found):
     """Verify frontend has templates"""
-    base_template = Path("frontend/templates/base.html")
-    if not base_template.exists():
+    if found.get("frontend/templates/base.html") is None:
         print("❌ frontend/templates/base.html not found")
         return False
 
@@ -79,10 +150,9 @@ def check_frontend_templates():
     return True
 
 
-def check_config():
+def check_config(found):
     """Verify configuration exists"""
-    config_file = Path("config/app.yaml")
-    if not config_file.exists():
+    if found.get("config/app.yaml") is None:
         print("❌ config/app.yaml not found")
         return False
 
@@ -94,6 +164,8 @@ def main():
     print("==> Checking interface contracts...")
     print("")
 
+    found = scan_required_paths()
+
     checks = [
         ("Config", check_config),
         ("Backend", check_backend_endpoints),
@@ -105,7 +177,7 @@ def main():
     results = []
     for name, check_func in checks:
         try:
-            result = check_func()
+            result = check_func(found)
             results.append(result)
         except Exception as e:
             print(f"❌ {name} check failed: {e}")
@@ -5,6 +5,8 @@ Clean up orphaned vectors in ChromaDB
 Run: python ops/scripts/cleanup_orphans.py
 """
 
+import functools
+import os
 import sys
 from pathlib import Path
 
@@ -13,14 +15,20 @@ import chromadb
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 
+@functools.lru_cache(maxsize=1)
+def get_notes_collection():
+    """Open the ChromaDB client once and reuse the collection handle"""
+    client = chromadb.PersistentClient(str(BASE_DIR / "rag/index/chroma"))
+    return client.get_collection("notes")
+
+
 def cleanup_orphaned_vectors():
     """Remove vectors for deleted files"""
     print("==> Checking for orphaned vectors in ChromaDB...")
     print()
 
     try:
-        client = chromadb.PersistentClient(str(BASE_DIR / "rag/index/chroma"))
-        coll = client.get_collection("notes")
+        coll = get_notes_collection()
     except Exception as e:
         print(f"❌ Failed to connect to ChromaDB: {e}")
         return 1
@@ -45,10 +53,17 @@ def cleanup_orphaned_vectors():
                     file_to_ids[filename] = []
                 file_to_ids[filename].append(all_docs["ids"][idx])
 
+        # Snapshot the inbox once; a set membership test per file beats a
+        # stat syscall per file when thousands of notes are indexed
+        try:
+            existing = set(os.listdir(inbox))
+        except FileNotFoundError:
+            existing = set()
+
         # Check each unique file
         for filename, doc_ids in file_to_ids.items():
             checked_count += 1
-            if not (inbox / filename).exists():
+            if filename not in existing:
                 # Delete all vectors for this file
                 coll.delete(ids=doc_ids)
                 deleted_count += len(doc_ids)
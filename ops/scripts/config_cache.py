@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Cached loader for config/app.yaml
+
+PyYAML parsing is milliseconds of pure-Python work, which adds up across
+the scripts that each load the config at startup. The parsed dict is
+pickled to config/.cache/app.<md5>.pkl keyed by the md5 of the raw file
+content, so any process can reload it with a microsecond pickle.load.
+The cache invalidates itself automatically whenever app.yaml changes,
+because a changed file hashes to a different cache filename.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+import yaml
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def load_app_cfg(config_file: Path = None) -> dict:
+    """
+    Load config/app.yaml through a content-keyed pickle cache.
+
+    Args:
+        config_file: Override path to the YAML file (default: config/app.yaml)
+
+    Returns:
+        Parsed configuration dict
+    """
+    if config_file is None:
+        config_file = BASE_DIR / "config/app.yaml"
+
+    raw = config_file.read_bytes()
+    digest = hashlib.md5(raw).hexdigest()
+    cache_dir = config_file.parent / ".cache"
+    cache_file = cache_dir / f"app.{digest}.pkl"
+
+    try:
+        return pickle.loads(cache_file.read_bytes())
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    cfg = yaml.safe_load(raw)
+
+    # Best-effort cache write: atomic replace so readers never see a
+    # partial pickle, and old-version caches are cleaned up as we go.
+    # The cache stays inside the project's config dir, never a shared tmp.
+    try:
+        cache_dir.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(cache_dir), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(cfg, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
+        for old in cache_dir.glob("app.*.pkl"):
+            if old != cache_file:
+                old.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+    return cfg
@@ -7,24 +7,41 @@ Usage:
 """
 
 import argparse
+import functools
 import json
+import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
 import chromadb
 import ollama
-import yaml
+
+try:
+    from ops.scripts.config_cache import load_app_cfg
+except ImportError:  # Run directly as a script (ops/scripts on sys.path)
+    from config_cache import load_app_cfg
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
+LATEX_OUTPUT_DIR = BASE_DIR / "latex/output"
 
 
 def load_config():
-    """Load application configuration"""
-    config_file = BASE_DIR / "config/app.yaml"
-    with open(config_file) as f:
-        return yaml.safe_load(f)
+    """Load application configuration (pickle-cached, see config_cache)"""
+    return load_app_cfg(BASE_DIR / "config/app.yaml")
+
+
+@functools.lru_cache(maxsize=1)
+def get_notes_collection():
+    """Open the ChromaDB client once and reuse the collection handle.
+
+    PersistentClient opens SQLite connections and loads HNSW shards on
+    init, so constructing it per file is expensive.
+    """
+    client = chromadb.PersistentClient(str(BASE_DIR / "rag/index/chroma"))
+    return client.get_collection("notes")
 
 
 def generate_title(content: str, model: str = "llama3.2:3b") -> str:
@@ -112,8 +129,7 @@ def sanitize_filename(title: str) -> str:
 def update_vector_db_metadata(old_filename: str, new_filename: str, date_str: str):
     """Update ChromaDB metadata for renamed file"""
     try:
-        client = chromadb.PersistentClient(str(BASE_DIR / "rag/index/chroma"))
-        coll = client.get_collection("notes")
+        coll = get_notes_collection()
 
         # Get all documents for this file
         all_docs = coll.get()
@@ -150,13 +166,15 @@ def update_vector_db_metadata(old_filename: str, new_filename: str, date_str: st
         return 0
 
 
-def migrate_file(file_path: Path, dry_run: bool = False) -> dict:
+def migrate_file(file_path: Path, dry_run: bool = False, title: str = None) -> dict:
     """
     Migrate a single file
 
     Args:
         file_path: Path to file to migrate
         dry_run: If True, don't actually rename files
+        title: Pre-generated title (optional). If None, a title is
+               generated from the file content here.
 
     Returns:
         Migration result dict
@@ -177,13 +195,16 @@ def migrate_file(file_path: Path, dry_run: bool = False) -> dict:
         return result
 
     try:
-        # Read content
-        content = file_path.read_text(encoding="utf-8")
-
-        # Generate title
-        config = load_config()
-        model = config.get("llm", {}).get("model", "llama3.2:3b")
-        title = generate_title(content, model)
+        if title is None:
+            # Read only the head of the file - generate_title only looks at the
+            # first 500 chars, so decoding a multi-MB transcript is wasted work
+            with open(file_path, "rb") as fh:
+                head = fh.read(4096).decode("utf-8", errors="replace")
+
+            # Generate title
+            config = load_config()
+            model = config.get("llm", {}).get("model", "llama3.2:3b")
+            title = generate_title(head, model)
         result["title"] = title
 
         # Create new filename
@@ -208,19 +229,21 @@ def migrate_file(file_path: Path, dry_run: bool = False) -> dict:
             )
             result["vectors_updated"] = vectors_updated
 
-            # Rename associated PDF/TEX files if they exist
+            # Rename associated PDF/TEX files if they exist. os.rename is
+            # atomic and raises FileNotFoundError cheaply when the source is
+            # absent, so a try/except costs one syscall instead of the
+            # stat + rename pair that Path.exists() + Path.rename() would.
             base_name = file_path.stem  # e.g., "2025-10-01_AI"
             new_base = f"{date_str}_{class_code}_{safe_title}"
 
-            # Check for PDF
-            pdf_path = BASE_DIR / "latex/output" / f"{base_name}.pdf"
-            if pdf_path.exists():
-                pdf_path.rename(pdf_path.parent / f"{new_base}.pdf")
-
-            # Check for TEX
-            tex_path = BASE_DIR / "latex/output" / f"{base_name}.tex"
-            if tex_path.exists():
-                tex_path.rename(tex_path.parent / f"{new_base}.tex")
+            for ext in (".pdf", ".tex"):
+                try:
+                    os.rename(
+                        LATEX_OUTPUT_DIR / f"{base_name}{ext}",
+                        LATEX_OUTPUT_DIR / f"{new_base}{ext}",
+                    )
+                except FileNotFoundError:
+                    pass
 
         result["success"] = True
 
@@ -252,11 +275,33 @@ def migrate_directory(directory: Path, class_filter: str = None, dry_run: bool =
 
     print(f"{'🔍 DRY RUN - ' if dry_run else ''}Found {len(files)} files to migrate\n")
 
+    # First pass: generate titles concurrently. Ollama serves requests in
+    # parallel and the GIL is released during socket IO, so the LLM calls
+    # (the slow part) overlap. Renames stay single-threaded in the second
+    # pass since they mutate the directory.
+    config = load_config()
+    model = config.get("llm", {}).get("model", "llama3.2:3b")
+
+    def _title_for(path: Path) -> str:
+        with open(path, "rb") as fh:
+            head = fh.read(4096).decode("utf-8", errors="replace")
+        return generate_title(head, model)
+
+    titles = {}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {executor.submit(_title_for, f): f for f in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                titles[path] = future.result()
+            except Exception as e:
+                print(f"⚠️  Title generation failed for {path.name}: {e}")
+
     results = {"success": [], "failed": [], "skipped": []}
 
     for i, file_path in enumerate(files, 1):
         print(f"[{i}/{len(files)}] {file_path.name}")
-        result = migrate_file(file_path, dry_run)
+        result = migrate_file(file_path, dry_run, title=titles.get(file_path))
 
         if result["success"]:
             print(f"  ✓ {result['title']}")
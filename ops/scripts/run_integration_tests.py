@@ -8,6 +8,26 @@ from pathlib import Path
 
 import requests
 
+# orjson is noticeably faster for the queue-file round-trips; fall back to
+# stdlib json when it isn't installed
+try:
+    import orjson
+
+    def _load_json(path: Path):
+        return orjson.loads(path.read_bytes())
+
+    def _write_json(path: Path, data: dict):
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+except ImportError:
+
+    def _load_json(path: Path):
+        return json.loads(path.read_text())
+
+    def _write_json(path: Path, data: dict):
+        path.write_text(json.dumps(data, indent=2))
+
+
 BASE_URL = "http://localhost:8000"
 
 
@@ -88,7 +108,7 @@ def test_latex_pipeline():
             },
             "output_name": "test_integration",
         }
-        input_file.write_text(json.dumps(input_data, indent=2))
+        _write_json(input_file, input_data)
         print("  Created test input file, waiting for LaTeX processing...")
 
         # Wait for processing (max 10 seconds)
@@ -98,7 +118,7 @@ def test_latex_pipeline():
 
         while waited < max_wait:
             if result_file.exists():
-                result = json.loads(result_file.read_text())
+                result = _load_json(result_file)
                 if result.get("success"):
                     print("✓ LaTeX pipeline test passed")
                     # Clean up
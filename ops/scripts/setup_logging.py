@@ -5,7 +5,10 @@ import logging
 import logging.config
 from pathlib import Path
 
-import yaml
+try:
+    from ops.scripts.config_cache import load_app_cfg
+except ImportError:  # Run directly as a script (ops/scripts on sys.path)
+    from config_cache import load_app_cfg
 
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(exist_ok=True)
@@ -70,8 +73,7 @@ def load_config_logging():
         return setup_logger("app")
 
     try:
-        with open(config_file, "r") as f:
-            config = yaml.safe_load(f)
+        config = load_app_cfg(config_file)
 
         logging_config = config.get("logging")
         if logging_config:
@@ -4,6 +4,7 @@ Sync vector DB index with files in inbox.
 Re-indexes files that are missing from VDB.
 """
 
+import functools
 import json
 import sys
 from pathlib import Path
@@ -13,23 +14,40 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 import chromadb
-import yaml
 
+from ops.scripts.config_cache import load_app_cfg
 from rag.search import index_document
 
-# Load config
-config_path = project_root / "config/app.yaml"
-with open(config_path) as f:
-    cfg = yaml.safe_load(f)
+# orjson parses straight from bytes and is ~3x faster than stdlib json,
+# which matters when syncing hundreds of metadata sidecars at startup
+try:
+    import orjson
+
+    def _load_json(path: Path):
+        return orjson.loads(path.read_bytes())
+
+except ImportError:
+
+    def _load_json(path: Path):
+        return json.loads(path.read_text())
+
+# Load config (pickle-cached, see config_cache)
+cfg = load_app_cfg(project_root / "config/app.yaml")
 
 inbox_path = project_root / cfg["paths"]["inbox_global"]
 
 
+@functools.lru_cache(maxsize=1)
+def get_notes_collection():
+    """Open the ChromaDB client once and reuse the collection handle"""
+    client = chromadb.PersistentClient(str(project_root / "rag/index/chroma"))
+    return client.get_collection("notes")
+
+
 def get_indexed_files():
     """Get set of filenames currently in VDB"""
     try:
-        client = chromadb.PersistentClient(str(project_root / "rag/index/chroma"))
-        coll = client.get_collection("notes")
+        coll = get_notes_collection()
         docs = coll.get()
         filenames = set()
         for meta in docs["metadatas"]:
@@ -86,7 +104,7 @@ def sync_index():
         meta_path = inbox_path / f"{f.stem}.meta.json"
         if meta_path.exists():
             try:
-                metadata = json.loads(meta_path.read_text())
+                metadata = _load_json(meta_path)
                 # Ensure 'date' field exists for compatibility
                 if "date" not in metadata:
                     metadata["date"] = (
@@ -1,24 +1,38 @@
-"""RAG (Retrieval-Augmented Generation) module"""
+"""RAG (Retrieval-Augmented Generation) module
 
-from rag.llm_client import summarize_for_pdf
-from rag.search import (
-    delete_document,
-    get_status,
-    index_document,
-    search,
-    search_with_categories,
-    search_with_synthesis,
-)
-from rag.title_generator import extract_date_from_content, generate_title
+Submodules are imported lazily (PEP 562): `import rag` is free, and the
+heavy transitive dependencies (sentence_transformers, chromadb, torch,
+ollama) are only paid for when the attribute that needs them is first
+touched. Callers that just want `rag.chunker` or `rag.state` never load
+the ML stack.
+"""
+import importlib
 
-__all__ = [
-    "search",
-    "index_document",
-    "delete_document",
-    "get_status",
-    "search_with_synthesis",
-    "search_with_categories",
-    "summarize_for_pdf",
-    "generate_title",
-    "extract_date_from_content",
-]
+# Public attribute -> submodule that defines it
+_EXPORTS = {
+    "search": "rag.search",
+    "index_document": "rag.search",
+    "delete_document": "rag.search",
+    "get_status": "rag.search",
+    "search_with_synthesis": "rag.search",
+    "search_with_categories": "rag.search",
+    "summarize_for_pdf": "rag.llm_client",
+    "generate_title": "rag.title_generator",
+    "extract_date_from_content": "rag.title_generator",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    try:
+        module = importlib.import_module(_EXPORTS[name])
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(module, name)
+    globals()[name] = value  # Cache so __getattr__ runs once per name
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
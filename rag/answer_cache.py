@@ -0,0 +1,101 @@
+"""
+Answer-level cache for synthesized RAG responses
+
+LLM synthesis dwarfs every other cost in the search path, and exam-prep
+traffic repeats questions. Answers are cached on disk keyed by the
+normalized query, the search scope, and a signature of the retrieved
+evidence - so a repeat question returns instantly, but any drift in
+what retrieval returns (re-indexed, added, or deleted notes) changes
+the signature and forces fresh synthesis. A secondary filename -> key
+table lets delete_document purge answers that cited a removed note
+outright.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_DB_PATH = Path(__file__).parent / "index" / "answer_cache.sqlite3"
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _get_conn() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        _DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(str(_DB_PATH), check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "key BLOB PRIMARY KEY, answer TEXT NOT NULL)"
+        )
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS answer_files ("
+            "filename TEXT, key BLOB, "
+            "PRIMARY KEY (filename, key))"
+        )
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+    return _conn
+
+
+def _evidence_signature(chunks: List[Dict]) -> str:
+    """Order-independent fingerprint of the retrieved evidence"""
+    return hashlib.sha256(
+        "".join(sorted(c["chunk"][:64] for c in chunks)).encode()
+    ).hexdigest()
+
+
+def _key(query: str, scope: str, evidence_sig: str) -> bytes:
+    return hashlib.sha256(
+        f"{query.strip().lower()}|{scope}|{evidence_sig}".encode()
+    ).digest()
+
+
+def get(query: str, scope: str, chunks: List[Dict]) -> Optional[str]:
+    """Return the cached answer for this (query, scope, evidence), if any"""
+    key = _key(query, scope, _evidence_signature(chunks))
+    with _lock:
+        row = (
+            _get_conn()
+            .execute("SELECT answer FROM answers WHERE key = ?", (key,))
+            .fetchone()
+        )
+    return row[0] if row else None
+
+
+def put(query: str, scope: str, chunks: List[Dict], answer: str):
+    """Store an answer and index it under every source filename it cites"""
+    key = _key(query, scope, _evidence_signature(chunks))
+    filenames = {c.get("source") for c in chunks} - {None, "unknown"}
+    with _lock:
+        conn = _get_conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO answers (key, answer) VALUES (?, ?)",
+            (key, answer),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO answer_files (filename, key) VALUES (?, ?)",
+            [(f, key) for f in filenames],
+        )
+        conn.commit()
+
+
+def invalidate_filename(filename: str):
+    """Drop every cached answer whose evidence cited this file"""
+    with _lock:
+        conn = _get_conn()
+        n = conn.execute(
+            "DELETE FROM answers WHERE key IN "
+            "(SELECT key FROM answer_files WHERE filename = ?)",
+            (filename,),
+        ).rowcount
+        conn.execute("DELETE FROM answer_files WHERE filename = ?", (filename,))
+        conn.commit()
+    if n:
+        logger.info(f"Invalidated {n} cached answers citing {filename}")
@@ -0,0 +1,119 @@
+"""
+Content-addressed embedding cache for document chunks
+
+Re-uploading a note re-embeds every chunk even though typo-fix edits
+leave most chunks byte-identical to the previous version. Vectors are
+keyed by SHA-256 of the chunk text in a small sqlite table, stored as
+float16 (half the disk/IO for negligible retrieval impact), and widened
+back to float32 on the way out. Only chunks the cache has never seen
+reach the model.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+import rag.state as state
+from rag import encode_batcher
+
+logger = logging.getLogger(__name__)
+
+_DB_PATH = Path(__file__).parent / "index" / "embed_cache.sqlite3"
+
+# sqlite caps bound parameters per statement (999 on older builds)
+_SELECT_BATCH = 500
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _chunk_key(text: str) -> bytes:
+    """Cache key for one chunk, namespaced by normalization mode.
+
+    Vectors cached while serving a legacy l2 collection (unnormalized)
+    must not be returned after a rebuild flips to normalized ip vectors,
+    and vice versa - the bytes differ even though the text is identical.
+    """
+    prefix = b"n" if state.normalize_vectors else b"r"
+    return hashlib.sha256(prefix + text.encode()).digest()
+
+
+def _get_conn() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        _DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(str(_DB_PATH), check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "sha256 BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+        )
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+    return _conn
+
+
+def encode_cached(model, chunks: List[str]) -> np.ndarray:
+    """
+    Encode chunks, skipping the model for byte-identical cached chunks.
+
+    Args:
+        model: SentenceTransformer instance
+        chunks: chunk texts in document order
+
+    Returns:
+        float32 ndarray of shape (len(chunks), dim), in input order
+    """
+    hashes = [_chunk_key(c) for c in chunks]
+    vectors = [None] * len(chunks)
+
+    with _lock:
+        conn = _get_conn()
+        found = {}
+        unique = list(set(hashes))
+        for i in range(0, len(unique), _SELECT_BATCH):
+            batch = unique[i : i + _SELECT_BATCH]
+            rows = conn.execute(
+                "SELECT sha256, vec FROM embeddings WHERE sha256 IN ({})".format(
+                    ",".join("?" * len(batch))
+                ),
+                batch,
+            ).fetchall()
+            found.update(rows)
+
+    for i, h in enumerate(hashes):
+        blob = found.get(h)
+        if blob is not None:
+            vectors[i] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+
+    miss_idx = [i for i, v in enumerate(vectors) if v is None]
+    if miss_idx:
+        # Encode each distinct missing chunk once, even if repeated.
+        # The batcher coalesces concurrent index_document calls into a
+        # single forward pass.
+        distinct = list({chunks[i] for i in miss_idx})
+        encoded = encode_batcher.encode(model, distinct)
+        by_text = dict(zip(distinct, np.asarray(encoded, dtype=np.float32)))
+
+        with _lock:
+            conn = _get_conn()
+            conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (sha256, vec) VALUES (?, ?)",
+                [
+                    (_chunk_key(t), v.astype(np.float16).tobytes())
+                    for t, v in by_text.items()
+                ],
+            )
+            conn.commit()
+
+        for i in miss_idx:
+            vectors[i] = by_text[chunks[i]]
+
+    logger.info(
+        f"Embedding cache: {len(chunks) - len(miss_idx)} hits, "
+        f"{len(miss_idx)} encoded"
+    )
+    return np.stack(vectors)
@@ -0,0 +1,120 @@
+"""
+Micro-batching layer for embedding encodes
+
+Upload bursts used to run one small model.encode() per document,
+back-to-back. Callers now hand their texts to a single background
+worker that coalesces everything arriving within a short window into
+one forward pass, amortizing tokenizer setup and kernel launches
+across requests. Callers block on a Future (or await it via
+encode_async) and get back exactly their slice of the batch.
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+
+import numpy as np
+
+import rag.state as state
+
+logger = logging.getLogger(__name__)
+
+# How long the worker waits for more requests to join a batch, and how
+# many chunks a batch may hold before it is flushed regardless
+WINDOW_MS = 50
+MAX_BATCH = 128
+
+_requests: "queue.Queue" = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _ensure_worker():
+    global _worker
+    if _worker is None or not _worker.is_alive():
+        with _worker_lock:
+            if _worker is None or not _worker.is_alive():
+                _worker = threading.Thread(
+                    target=_run, name="encode-batcher", daemon=True
+                )
+                _worker.start()
+
+
+def _run():
+    while True:
+        # Block for the first request, then collect more until the
+        # window closes or the batch is full
+        model, texts, future = _requests.get()
+        batch = [(texts, future)]
+        total = len(texts)
+        deadline = time.monotonic() + WINDOW_MS / 1000.0
+        while total < MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                _, more_texts, more_future = _requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append((more_texts, more_future))
+            total += len(more_texts)
+
+        all_texts = [t for item_texts, _ in batch for t in item_texts]
+        try:
+            # Smart batching: encode in length order so each sub-batch
+            # holds similar-length texts. The transformer pads every item
+            # to the longest in its sub-batch, and chunker output has a
+            # long tail (short trailing chunks), so unsorted batches can
+            # spend up to half their FLOPs on PAD tokens. Unsort after.
+            order = np.argsort([len(t) for t in all_texts], kind="stable")
+            # normalize_embeddings so an inner-product collection
+            # computes true cosine similarity with plain dots; legacy
+            # l2 collections (state.normalize_vectors False) keep raw
+            # vectors so their stored neighbors stay comparable
+            sorted_embs = model.encode(
+                [all_texts[i] for i in order],
+                batch_size=64,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+                normalize_embeddings=state.normalize_vectors,
+            )
+            embeddings = np.empty_like(sorted_embs)
+            embeddings[order] = sorted_embs
+        except Exception as e:
+            for _, f in batch:
+                f.set_exception(e)
+            continue
+
+        if len(batch) > 1:
+            logger.info(
+                f"Coalesced {len(batch)} encode calls into one batch "
+                f"of {total} chunks"
+            )
+
+        pos = 0
+        for item_texts, f in batch:
+            f.set_result(embeddings[pos : pos + len(item_texts)])
+            pos += len(item_texts)
+
+
+def encode(model, texts: List[str]) -> np.ndarray:
+    """Encode texts, coalescing with any concurrent callers. Blocking."""
+    if not texts:
+        return np.empty((0, model.get_sentence_embedding_dimension()))
+    _ensure_worker()
+    future: Future = Future()
+    _requests.put((model, list(texts), future))
+    return future.result()
+
+
+async def encode_async(model, texts: List[str]) -> np.ndarray:
+    """Awaitable variant of encode() for async callers."""
+    if not texts:
+        return np.empty((0, model.get_sentence_embedding_dimension()))
+    _ensure_worker()
+    future: Future = Future()
+    _requests.put((model, list(texts), future))
+    return await asyncio.wrap_future(future)
@@ -0,0 +1,135 @@
+"""
+Optional FAISS hot path for retrieval
+
+Chroma stays the durable store (persistence, metadata), but its
+Python-wrapped HNSW dominates search() latency. When faiss is installed
+and rag.use_faiss is enabled, a mirror faiss.IndexHNSWFlat (native
+C++, SIMD distance kernels) serves the queries instead, with chunk
+metadata kept in a parallel Python list indexed by FAISS row id.
+
+Deletes are tombstones: the vector stays in the graph but its row is
+cleared and filtered out of results. For a notes-sized collection the
+wasted entries are negligible and avoid a graph rebuild per delete.
+"""
+import logging
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+
+    _HAVE_FAISS = True
+except ImportError:
+    _HAVE_FAISS = False
+
+logger = logging.getLogger(__name__)
+
+
+class FaissIndex:
+    """HNSW inner-product index mirroring the Chroma collection"""
+
+    def __init__(self, dim: int, path: Optional[str] = None):
+        if not _HAVE_FAISS:
+            raise RuntimeError("faiss not installed; FAISS backend unavailable")
+
+        self._dim = dim
+        self._path = Path(path) if path else None
+        self._lock = threading.Lock()
+        # Inner product on L2-normalized vectors == cosine similarity,
+        # so distances convert to scores exactly like Chroma's cosine
+        # space (score = 1 - dist)
+        self._index = faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+        self._index.hnsw.efConstruction = 100
+        self._index.hnsw.efSearch = 64
+        # Row id -> metadata dict (with "chunk"); None marks a tombstone
+        self._rows: List[Optional[dict]] = []
+
+        if self._path and self._path.exists():
+            try:
+                self._index = faiss.read_index(str(self._path))
+                self._rows = pickle.loads(
+                    self._path.with_suffix(".meta").read_bytes()
+                )
+                logger.info(f"[OK] FAISS index loaded: {len(self._rows)} rows")
+            except Exception as e:
+                logger.warning(f"[WARN] FAISS index load failed, rebuilding: {e}")
+
+    def __len__(self) -> int:
+        return sum(1 for r in self._rows if r is not None)
+
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    def add(self, embeddings: np.ndarray, documents: List[str], metadatas: List[dict]):
+        """Append vectors and their metadata rows"""
+        with self._lock:
+            self._index.add(self._normalize(embeddings))
+            self._rows.extend(
+                {**meta, "chunk": doc} for doc, meta in zip(documents, metadatas)
+            )
+
+    def search(
+        self, query: np.ndarray, top_k: int, class_code: Optional[str] = None
+    ) -> Tuple[list, list, list]:
+        """Return (documents, metadatas, distances) for the top hits.
+
+        Distances are 1 - cosine similarity, matching Chroma's cosine
+        space. When filtering by class, over-fetch so post-filtering
+        still fills top_k.
+        """
+        with self._lock:
+            total = len(self._rows)
+            if total == 0:
+                return [], [], []
+            k = min(total, top_k if class_code is None else top_k * 4)
+            sims, rows = self._index.search(
+                self._normalize(np.atleast_2d(query)), k
+            )
+
+            docs, metas, dists = [], [], []
+            for sim, row in zip(sims[0], rows[0]):
+                if row < 0:
+                    continue
+                meta = self._rows[row]
+                if meta is None:
+                    continue
+                if class_code is not None and meta.get("class_code") != class_code:
+                    continue
+                docs.append(meta["chunk"])
+                metas.append({k_: v for k_, v in meta.items() if k_ != "chunk"})
+                dists.append(1.0 - float(sim))
+                if len(docs) == top_k:
+                    break
+            return docs, metas, dists
+
+    def delete_by_filename(self, filename: str) -> int:
+        """Tombstone every row belonging to a file"""
+        with self._lock:
+            n = 0
+            for i, meta in enumerate(self._rows):
+                if meta is not None and meta.get("filename") == filename:
+                    self._rows[i] = None
+                    n += 1
+            return n
+
+    def save(self):
+        """Persist index and metadata atomically"""
+        if self._path is None:
+            return
+        with self._lock:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._path.with_suffix(".tmp")
+            faiss.write_index(self._index, str(tmp))
+            os.replace(tmp, self._path)
+            meta_file = self._path.with_suffix(".meta")
+            meta_tmp = meta_file.with_suffix(".meta.tmp")
+            meta_tmp.write_bytes(pickle.dumps(self._rows))
+            os.replace(meta_tmp, meta_file)
@@ -3,24 +3,44 @@ RAG Indexer - Model initialization and vector store setup
 """
 import json
 import logging
+import os
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 import chromadb
+import numpy as np
 import yaml
 from sentence_transformers import SentenceTransformer
 
 # Import shared state instead of module-level globals
 import rag.state as state
 
+try:  # orjson serializes ~5-10x faster than stdlib json
+    import orjson
+except ImportError:
+    orjson = None
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
 
+# Parsed-config cache guarded by the file's mtime: YAML parsing is
+# regex-driven and surprisingly heavy, so re-parse only when app.yaml
+# actually changes (one stat syscall per call otherwise)
+_config_cache = {"mtime": -1.0, "data": None}
+
+# libyaml's C loader is ~10x faster than the pure-Python SafeLoader when
+# the binding is compiled in
+try:
+    _YAML_LOADER = yaml.CSafeLoader
+except AttributeError:
+    _YAML_LOADER = yaml.SafeLoader
+
+
 def load_config() -> dict:
     """Load configuration from app.yaml, use defaults if not found"""
     config_path = Path(__file__).parent.parent / "config" / "app.yaml"
@@ -37,18 +57,25 @@ def load_config() -> dict:
         }
     }
 
-    if config_path.exists():
-        try:
-            config = yaml.safe_load(config_path.read_text())
-            logger.info(f"[OK] Config loaded from: {config_path}")
-            return config
-        except Exception as e:
-            logger.warning(f"[WARN] Failed to load config: {e}, using defaults")
-            return default_config
-    else:
+    try:
+        mtime = config_path.stat().st_mtime
+    except OSError:
         logger.warning(f"[WARN] Config not found at {config_path}, using defaults")
         return default_config
 
+    if mtime == _config_cache["mtime"] and _config_cache["data"] is not None:
+        return _config_cache["data"]
+
+    try:
+        config = yaml.load(config_path.read_text(), Loader=_YAML_LOADER)
+        logger.info(f"[OK] Config loaded from: {config_path}")
+        _config_cache["mtime"] = mtime
+        _config_cache["data"] = config
+        return config
+    except Exception as e:
+        logger.warning(f"[WARN] Failed to load config: {e}, using defaults")
+        return default_config
+
 
 def verify_and_load_model() -> bool:
     """Verify model folder exists and load the embedding model"""
@@ -69,12 +96,62 @@ def verify_and_load_model() -> bool:
 
         logger.info(f"[OK] Model folder present: {model_path}")
 
-        # Load the model into shared state
+        # Load the model into shared state. If an ONNX export is
+        # configured and loadable it replaces the PyTorch backend
+        # (2-4x faster CPU encodes); otherwise fall through to
+        # SentenceTransformer.
         logger.info("Loading embedding model...")
-        state.model = SentenceTransformer(str(model_path))
+        state.model = None
+        onnx_path = cfg["rag"].get("onnx_model_path")
+        if onnx_path:
+            try:
+                from rag.onnx_encoder import OnnxEncoder
+
+                state.model = OnnxEncoder(onnx_path, max_seq_length=256)
+            except Exception as e:
+                logger.warning(f"[WARN] ONNX backend unavailable ({e}), using torch")
+
+        if state.model is None:
+            state.model = SentenceTransformer(str(model_path))
+
+            # Chunks are ~500 words but bge-small truncates at its
+            # max_seq_length in *tokens*; 256 keeps virtually all chunk
+            # content while halving per-chunk attention cost versus the
+            # model's 512 default
+            state.model.max_seq_length = 256
+
         embedding_dim = state.model.get_sentence_embedding_dimension()
         logger.info(f"[OK] Model loaded: {embedding_dim} dims")
 
+        # Optional int8 dynamic quantization of the transformer's Linear
+        # layers: half the bandwidth and roughly 2x CPU throughput for
+        # <0.5% retrieval quality loss on bge-small. Off by default;
+        # enable with rag.quantize_int8 in app.yaml. Quantize before the
+        # warm-up pass so the quantized kernels get warmed. (An ONNX
+        # backend handles quantization at export time instead.)
+        if cfg["rag"].get("quantize_int8", False) and isinstance(
+            state.model, SentenceTransformer
+        ):
+            try:
+                import torch
+
+                state.model[0].auto_model = torch.quantization.quantize_dynamic(
+                    state.model[0].auto_model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                logger.info("[OK] Model quantized to int8 (dynamic)")
+            except Exception as e:
+                logger.warning(f"[WARN] int8 quantization failed, using fp32: {e}")
+
+        # Warm-up forward pass so the first real encode() doesn't pay
+        # PyTorch kernel-autotune costs (hundreds of ms) at request time
+        state.model.encode(
+            ["warmup"] * 8,
+            batch_size=8,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        logger.info("[OK] Model warmed up")
+
         return True
 
     except Exception as e:
@@ -95,11 +172,79 @@ def initialize_vector_store() -> bool:
 
         logger.info(f"Initializing vector store at: {index_path}")
         state.client = chromadb.PersistentClient(path=str(index_path))
-        state.collection = state.client.get_or_create_collection(name=collection_name)
+        # HNSW tuned for the small-collection regime (<100k vectors):
+        # inner-product space over vectors we normalize at encode time -
+        # each comparison is a plain dot product (no sqrt/div), and
+        # Chroma's ip distance is 1 - dot, so 1 - distance still reads
+        # as cosine similarity downstream. search_ef sits below Chroma's
+        # default: the neighbor frontier is the per-query cost knob, and
+        # defaults over-search at this scale. Note these only apply when
+        # the collection is first created; get_or_create_collection
+        # ignores metadata for existing ones.
+        state.collection = state.client.get_or_create_collection(
+            name=collection_name,
+            metadata={
+                "hnsw:space": "ip",
+                "hnsw:M": 16,
+                "hnsw:construction_ef": 100,
+                "hnsw:search_ef": 64,
+            },
+        )
 
         doc_count = state.collection.count()
+        state.collection_size = doc_count
         logger.info(f"[OK] Vector store ready: {doc_count} documents")
 
+        # Collections created before the ip-space tuning live in Chroma's
+        # default l2 space and hold unnormalized vectors. Normalizing only
+        # the new side (queries and fresh chunks) would make distances
+        # norm-dominated and push legacy chunks out of the top-k, so for
+        # those collections normalization is disabled everywhere and the
+        # legacy behavior is preserved until the index is rebuilt.
+        space = (state.collection.metadata or {}).get("hnsw:space", "l2")
+        state.normalize_vectors = space == "ip"
+        if not state.normalize_vectors:
+            logger.warning(
+                f"[WARN] Collection '{collection_name}' uses legacy {space} "
+                f"space; embeddings stay unnormalized for compatibility. "
+                f"Delete {index_path} and re-index to enable the cosine "
+                f"(ip) fast path."
+            )
+
+        # Optional FAISS hot path: mirror the collection into a native
+        # HNSW index and let search() query that instead of Chroma's
+        # Python-wrapped traversal. Chroma stays the durable store.
+        # Skipped for legacy l2 collections - the mirror ranks by cosine
+        # over normalized vectors, which would diverge from the l2
+        # ranking the durable store still serves.
+        if cfg["rag"].get("use_faiss", False) and not state.normalize_vectors:
+            logger.warning(
+                "[WARN] use_faiss ignored for legacy l2 collection; "
+                "re-index to enable it"
+            )
+        elif cfg["rag"].get("use_faiss", False):
+            try:
+                from rag.faiss_index import FaissIndex
+
+                dim = state.model.get_sentence_embedding_dimension()
+                faiss_path = index_path / "faiss_hnsw.index"
+                mirror = FaissIndex(dim, path=str(faiss_path))
+                if len(mirror) == 0 and doc_count > 0:
+                    logger.info("Rebuilding FAISS mirror from collection...")
+                    existing = state.collection.get(
+                        include=["embeddings", "documents", "metadatas"]
+                    )
+                    mirror.add(
+                        np.asarray(existing["embeddings"], dtype=np.float32),
+                        existing["documents"],
+                        existing["metadatas"],
+                    )
+                    mirror.save()
+                state.faiss_index = mirror
+                logger.info(f"[OK] FAISS hot path active: {len(mirror)} rows")
+            except Exception as e:
+                logger.warning(f"[WARN] FAISS backend unavailable ({e}), using Chroma")
+
         return True
 
     except Exception as e:
@@ -117,26 +262,47 @@ def update_status(error: Optional[str] = None):
         status = {
             "timestamp": datetime.now().isoformat(),
             "model_loaded": state.model is not None,
-            "index_size": state.collection.count() if state.collection else 0,
+            "index_size": state.collection_size if state.collection else 0,
             "ready": state.model is not None and state.collection is not None,
             "last_error": error,
         }
 
+        # Write atomically so readers never see a partially-written file
         status_file = logs_path / "rag_status.json"
-        status_file.write_text(json.dumps(status, indent=2))
+        tmp_file = status_file.with_suffix(".json.tmp")
+        if orjson is not None:
+            tmp_file.write_bytes(orjson.dumps(status, option=orjson.OPT_INDENT_2))
+        else:
+            tmp_file.write_text(json.dumps(status, indent=2))
+        os.replace(tmp_file, status_file)
 
     except Exception as e:
         logger.error(f"[ERROR] Failed to write status file: {e}")
 
 
 def run_status_updater(interval: int = 30):
-    """Continuously update status file every interval seconds"""
+    """Write the status file when state actually changes.
+
+    Waits on state.on_change (set by index_document/delete_document) with
+    `interval` as a fallback timeout, and skips the write when nothing
+    observable changed - so sub-interval transitions are picked up
+    immediately and an idle system stops rewriting an identical file.
+    """
     logger.info(f"Starting status updater (interval: {interval}s)")
 
+    last_written = None
     while True:
         try:
-            update_status()
-            time.sleep(interval)
+            state.on_change.wait(timeout=interval)
+            state.on_change.clear()
+
+            current = (
+                state.collection_size if state.collection else 0,
+                state.model is not None,
+            )
+            if current != last_written:
+                update_status()
+                last_written = current
         except KeyboardInterrupt:
             logger.info("Status updater stopped")
             break
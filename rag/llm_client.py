@@ -1,28 +1,263 @@
 """LLM client for synthesizing RAG results into coherent answers"""
+import asyncio
+import atexit
+import hashlib
 import logging
-from typing import Dict, List
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
 
 import ollama
 import requests
 
+import rag.state as state
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 logger = logging.getLogger(__name__)
 
+# Pooled HTTP session for Ollama probes: keep-alive avoids a TCP handshake
+# and file-descriptor churn per request, which matters under concurrent
+# PDF exports
+_session = requests.Session()
+_session.mount(
+    "http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+)
 
-def get_available_models() -> List[str]:
-    """Get list of available Ollama models"""
+# --- Semantic response cache -------------------------------------------------
+# Generation dominates latency in this module, and the same notes/queries hit
+# the model repeatedly (re-exports of a PDF, retried questions). Exact repeats
+# are served from an LRU dict keyed by a hash of the normalized prompt text;
+# near-repeats (a typo fix, an added sentence) are matched by cosine
+# similarity using the embedding model already loaded in rag.state.
+
+_CACHE_MAX = 256
+_CACHE_SIM_THRESHOLD = 0.97
+_CACHE_FILE = Path(__file__).parent.parent / "logs" / "llm_cache.pkl"
+
+# Kinds whose keys are composites carrying an evidence digest (e.g.
+# "synthesize": query|citations|sha1(chunks)). Fuzzy matching would see
+# two keys differing only in the 40-char digest as near-identical text
+# and happily serve an answer computed over stale evidence - exactly
+# what the digest exists to prevent - so these kinds are exact-match
+# only and never store an embedding.
+_EXACT_ONLY_KINDS = frozenset({"synthesize"})
+
+_llm_cache: "OrderedDict[bytes, dict]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _normalize_for_cache(text: str) -> str:
+    """Lowercase and collapse whitespace so trivial edits still hit"""
+    return " ".join(text.lower().split())
+
+
+def _cache_key(kind: str, norm_text: str) -> bytes:
+    return hashlib.sha1(f"{kind}|{norm_text}".encode()).digest()
+
+
+def _embed_for_cache(norm_text: str):
+    """Unit-norm embedding of the normalized text, or None if unavailable"""
+    if np is None or state.model is None:
+        return None
     try:
-        response = requests.get("http://localhost:11434/api/tags", timeout=2)
-        if response.status_code == 200:
-            models = response.json().get("models", [])
-            return [m["name"] for m in models]
-        return []
+        vec = state.model.encode([norm_text[:2000]])[0].astype(np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else None
     except Exception:
-        return []
+        return None
+
+
+def _cache_get(kind: str, text: str):
+    """Return a cached value for (kind, text), exact or semantically close"""
+    norm = _normalize_for_cache(text)
+    key = _cache_key(kind, norm)
+
+    with _cache_lock:
+        entry = _llm_cache.get(key)
+        if entry is not None:
+            _llm_cache.move_to_end(key)
+            return entry["value"]
+
+    if kind in _EXACT_ONLY_KINDS:
+        return None
+
+    # Fuzzy lookup: one (N, dim) @ (dim,) dot product over cached embeddings
+    query_emb = _embed_for_cache(norm)
+    if query_emb is None:
+        return None
+
+    with _cache_lock:
+        candidates = [
+            (k, e)
+            for k, e in _llm_cache.items()
+            if e["kind"] == kind and e.get("emb") is not None
+        ]
+        if not candidates:
+            return None
+
+        sims = np.stack([e["emb"] for _, e in candidates]) @ query_emb
+        best = int(np.argmax(sims))
+        if sims[best] >= _CACHE_SIM_THRESHOLD:
+            best_key = candidates[best][0]
+            _llm_cache.move_to_end(best_key)
+            return candidates[best][1]["value"]
+
+    return None
+
+
+def _cache_put(kind: str, text: str, value):
+    """Store an LLM result, evicting least-recently-used entries"""
+    norm = _normalize_for_cache(text)
+    key = _cache_key(kind, norm)
+    emb = None if kind in _EXACT_ONLY_KINDS else _embed_for_cache(norm)
+
+    with _cache_lock:
+        _llm_cache[key] = {"kind": kind, "value": value, "emb": emb}
+        _llm_cache.move_to_end(key)
+        while len(_llm_cache) > _CACHE_MAX:
+            _llm_cache.popitem(last=False)
+
+
+def _load_cache():
+    """Best-effort reload of the persisted cache from a prior run"""
+    try:
+        with open(_CACHE_FILE, "rb") as f:
+            saved = pickle.load(f)
+        with _cache_lock:
+            _llm_cache.update(saved)
+    except Exception:
+        pass
+
+
+def _save_cache():
+    """Persist the cache at shutdown so warm entries survive restarts"""
+    try:
+        _CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with _cache_lock:
+            snapshot = dict(_llm_cache)
+        with open(_CACHE_FILE, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        pass
+
+
+_load_cache()
+atexit.register(_save_cache)
+
+# Prompt-prefix (KV) cache settings. The system prompt is byte-identical
+# across summarize calls, so llama.cpp can reuse the attention states for
+# those tokens instead of re-running prefill - but only if the model stays
+# resident (keep_alive) and is told to retain the prefix (num_keep).
+# num_keep is a token count; ~4 chars/token is a safe underestimate.
+_KEEP_ALIVE = "10m"
+
+
+def _prefix_token_estimate(prompt: str) -> int:
+    return len(prompt) // 4
+
+
+# --- Prompt constants --------------------------------------------------------
+# The invariant parts of every prompt live here; call sites only fill in the
+# variable text via .format(). Besides avoiding per-call allocation of these
+# multi-hundred-byte literals, stable prompt bytes keep the response-cache
+# keys and the num_keep prefix estimate consistent across calls.
+
+_SYNTHESIS_PROMPT_TEMPLATE = """You are an AI assistant helping a student review their notes.
+
+User's Question: {query}
+
+Relevant Notes:
+{context}
+
+Instructions:
+1. Answer the user's question based ONLY on the notes provided
+2. Use markdown formatting with structure:
+   - Start with a brief 1-sentence overview
+   - Use ## headings for main topics
+   - Use emojis to make it engaging (📚 🎯 💡 📝 ⚡ 🔍 etc.)
+   - Use bullet points (•) or numbered lists
+   - Use **bold** for key terms or names
+   - Keep it concise (2-4 short sections)
+3. If the notes mention specific dates, people, or events, highlight them with **bold**
+4. If the notes don't fully answer the question, say so at the end
+5. Use a friendly, conversational tone
+
+Format Example:
+📚 Brief one-sentence summary here.
+
+## 🎯 Main Topic 1
+• Key point with **important term**
+• Another detail
+
+## 💡 Main Topic 2
+• More information
+
+Answer:"""
+
+_SYSTEM_PROMPT_PDF = """You are an intelligent note assistant. Your job is to:
+1. Analyze and understand the student's notes
+2. Fix typos and improve clarity
+3. Organize information logically with headers and bullet points
+4. Add critical insights and actionable items
+5. Preserve ALL original information while making it more useful
+
+Output in clean markdown format (# for headers, - for bullets, **bold** for key terms)."""
+
+_USER_PROMPT_TEMPLATE_PDF = """Analyze and format these notes. Add insights about priorities, deadlines, and connections between items:
+
+{text}
+
+---
+Provide formatted, actionable notes:"""
+
+
+# --- Model-probe cache -------------------------------------------------------
+# Every summarize/synthesize call probes Ollama for its model list - a full
+# HTTP round-trip that is pure overhead when notes are processed in a batch.
+# The probe result changes rarely (a model pull/removal), so it is cached
+# with a short TTL. Failures are not cached, so the daemon is re-probed as
+# soon as it recovers.
+
+_MODEL_CACHE_TTL = 60.0
+_model_cache = {"models": None, "best": None, "ts": 0.0}
+_model_cache_lock = threading.Lock()
+
+
+def get_available_models() -> List[str]:
+    """Get list of available Ollama models (cached for 60s)"""
+    with _model_cache_lock:
+        if (
+            _model_cache["models"] is not None
+            and time.monotonic() - _model_cache["ts"] < _MODEL_CACHE_TTL
+        ):
+            return list(_model_cache["models"])
+
+        try:
+            response = _session.get("http://localhost:11434/api/tags", timeout=2)
+            if response.status_code == 200:
+                models = response.json().get("models", [])
+                names = [m["name"] for m in models]
+                _model_cache.update(models=names, best=None, ts=time.monotonic())
+                return list(names)
+            return []
+        except Exception:
+            # Don't cache failures - re-probe once Ollama is back
+            _model_cache.update(models=None, best=None, ts=0.0)
+            return []
 
 
 def get_best_available_model() -> str:
     """
-    Auto-detect best available model for formatting
+    Auto-detect best available model for formatting (cached for 60s)
 
     Priority:
     1. llama3.2:3b (configured)
@@ -31,6 +266,13 @@ def get_best_available_model() -> str:
     4. Any llama3 variant
     5. Any model
     """
+    with _model_cache_lock:
+        if (
+            _model_cache["best"] is not None
+            and time.monotonic() - _model_cache["ts"] < _MODEL_CACHE_TTL
+        ):
+            return _model_cache["best"]
+
     available = get_available_models()
 
     if not available:
@@ -47,20 +289,28 @@ def get_best_available_model() -> str:
         "phi3:mini",
     ]
 
+    best = None
     for model in preferred:
         if model in available:
             logger.info(f"✅ Using model: {model}")
-            return model
+            best = model
+            break
 
-    # Fallback to first llama model
-    llama_models = [m for m in available if "llama" in m.lower()]
-    if llama_models:
-        logger.info(f"✅ Using fallback model: {llama_models[0]}")
-        return llama_models[0]
+    if best is None:
+        # Fallback to first llama model
+        llama_models = [m for m in available if "llama" in m.lower()]
+        if llama_models:
+            logger.info(f"✅ Using fallback model: {llama_models[0]}")
+            best = llama_models[0]
+        else:
+            # Use any available model
+            logger.warning(f"⚠️ Using first available model: {available[0]}")
+            best = available[0]
 
-    # Use any available model
-    logger.warning(f"⚠️ Using first available model: {available[0]}")
-    return available[0]
+    with _model_cache_lock:
+        _model_cache["best"] = best
+
+    return best
 
 
 def synthesize_answer(query: str, chunks: List[Dict], max_tokens: int = 500) -> str:
@@ -86,51 +336,46 @@ def synthesize_answer(query: str, chunks: List[Dict], max_tokens: int = 500) ->
     )
 
     # Create prompt
-    prompt = f"""You are an AI assistant helping a student review their notes.
-
-User's Question: {query}
-
-Relevant Notes:
-{context}
-
-Instructions:
-1. Answer the user's question based ONLY on the notes provided
-2. Use markdown formatting with structure:
-   - Start with a brief 1-sentence overview
-   - Use ## headings for main topics
-   - Use emojis to make it engaging (📚 🎯 💡 📝 ⚡ 🔍 etc.)
-   - Use bullet points (•) or numbered lists
-   - Use **bold** for key terms or names
-   - Keep it concise (2-4 short sections)
-3. If the notes mention specific dates, people, or events, highlight them with **bold**
-4. If the notes don't fully answer the question, say so at the end
-5. Use a friendly, conversational tone
-
-Format Example:
-📚 Brief one-sentence summary here.
-
-## 🎯 Main Topic 1
-• Key point with **important term**
-• Another detail
-
-## 💡 Main Topic 2
-• More information
-
-Answer:"""
+    prompt = _SYNTHESIS_PROMPT_TEMPLATE.format(query=query, context=context)
+
+    # Repeat questions ("what did I do today?", "summary of lecture 5") are
+    # common in exam prep. Key the cache on the normalized query plus the
+    # retrieved evidence - the sorted citation set and a digest of the chunk
+    # texts - so a repeat question over the same evidence skips the LLM,
+    # while re-indexing a document (same citation, new content) naturally
+    # misses instead of serving a stale answer.
+    top = chunks[:5]
+    evidence_sig = hashlib.sha1(
+        "\x00".join(c["chunk"] for c in top).encode()
+    ).hexdigest()
+    cache_key = "{}|{}|{}".format(
+        query.strip().lower(),
+        ",".join(sorted(c["citation"] for c in top)),
+        evidence_sig,
+    )
+    cached = _cache_get("synthesize", cache_key)
+    if cached is not None:
+        logger.info("LLM cache hit for synthesize_answer (cache_hit=True)")
+        return cached
 
     try:
-        # Call Ollama
-        response = ollama.generate(
+        # Call Ollama, streaming so tokens accumulate as they are generated
+        # instead of blocking until the full answer exists
+        parts = []
+        for part in ollama.generate(
             model="llama3.2:3b",
             prompt=prompt,
+            stream=True,
             options={
                 "temperature": 0.7,
                 "num_predict": max_tokens,
             },
-        )
+        ):
+            parts.append(part["response"])
 
-        answer = response["response"].strip()
+        answer = "".join(parts).strip()
         logger.info(f"LLM synthesis complete: {len(answer)} chars")
+        _cache_put("synthesize", cache_key, answer)
         return answer
 
     except Exception as e:
@@ -141,7 +386,9 @@ Answer:"""
         )
 
 
-def summarize_for_pdf(text: str, timeout: int = 30) -> dict:
+def summarize_for_pdf(
+    text: str, timeout: int = 30, on_token=None, max_input_chars: int = 20000
+) -> dict:
     """
     Clean and format text for PDF generation.
     Maintains ALL information but improves readability.
@@ -149,6 +396,14 @@ def summarize_for_pdf(text: str, timeout: int = 30) -> dict:
     Args:
         text: Raw note content
         timeout: Maximum seconds to wait for LLM
+        on_token: Optional callable invoked with each streamed token, so a
+                  caller (e.g. an SSE/WebSocket handler) can forward output
+                  to the browser while generation is still running
+        max_input_chars: Inputs longer than this are reduced to head + tail
+                  before hitting the model. ~20k chars is ~5.7k tokens,
+                  inside llama3.2's default 8k context with room for output;
+                  anything longer pays quadratic attention cost and risks
+                  silent truncation by Ollama
 
     Returns:
         {
@@ -167,6 +422,28 @@ def summarize_for_pdf(text: str, timeout: int = 30) -> dict:
             "error": "Empty input",
         }
 
+    # Keep oversized notes inside the model's context window: head + tail
+    # preserves the intro and the most recent additions, which is where
+    # note content concentrates. Truncate before the cache lookup so the
+    # same oversized note keys consistently.
+    if len(text) > max_input_chars:
+        half = max_input_chars // 2
+        logger.warning(
+            f"⚠️ Input too large for LLM ({len(text)} chars, "
+            f"~{int(len(text) // 3.5)} tokens); truncating to head+tail of "
+            f"{half} chars each"
+        )
+        text = text[:half] + "\n...\n" + text[-half:]
+
+    # Identical or near-identical notes (e.g. repeated PDF exports) skip
+    # the LLM entirely
+    cached = _cache_get("summarize", text)
+    if cached is not None:
+        logger.info("LLM cache hit for summarize_for_pdf")
+        result = dict(cached)
+        result["cache_hit"] = True
+        return result
+
     # Auto-detect model
     model = get_best_available_model()
 
@@ -180,39 +457,36 @@ def summarize_for_pdf(text: str, timeout: int = 30) -> dict:
         }
 
     # Separate system instructions from user content
-    system_prompt = """You are an intelligent note assistant. Your job is to:
-1. Analyze and understand the student's notes
-2. Fix typos and improve clarity
-3. Organize information logically with headers and bullet points
-4. Add critical insights and actionable items
-5. Preserve ALL original information while making it more useful
-
-Output in clean markdown format (# for headers, - for bullets, **bold** for key terms)."""
-
-    user_prompt = f"""Analyze and format these notes. Add insights about priorities, deadlines, and connections between items:
-
-{text}
-
----
-Provide formatted, actionable notes:"""
+    system_prompt = _SYSTEM_PROMPT_PDF
+    user_prompt = _USER_PROMPT_TEMPLATE_PDF.format(text=text)
 
     try:
         logger.info(f"🤖 Using model '{model}' to format {len(text)} characters...")
 
-        # Call Ollama with system/user separation
-        response = ollama.chat(
+        # Call Ollama with system/user separation, streaming tokens so the
+        # caller can start work (or forward output) before generation ends
+        parts = []
+        for part in ollama.chat(
             model=model,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
+            stream=True,
+            keep_alive=_KEEP_ALIVE,
             options={
                 "temperature": 0.4,  # Slightly higher for creative insights
                 "top_p": 0.9,
+                # Retain the static system prompt in the KV cache across calls
+                "num_keep": _prefix_token_estimate(system_prompt),
             },
-        )
+        ):
+            token = part["message"]["content"]
+            parts.append(token)
+            if on_token is not None:
+                on_token(token)
 
-        formatted = response["message"]["content"].strip()
+        formatted = "".join(parts).strip()
 
         # Validate output
         if not formatted or len(formatted) < len(text) * 0.5:
@@ -229,13 +503,15 @@ Provide formatted, actionable notes:"""
         logger.info(
             f"✅ LLM formatting successful: {len(text)} → {len(formatted)} chars"
         )
-        return {
+        result = {
             "formatted_text": formatted,
             "success": True,
             "used_llm": True,
             "error": None,
             "model_used": model,
         }
+        _cache_put("summarize", text, result)
+        return result
 
     except Exception as e:
         error_msg = f"LLM formatting failed: {str(e)}"
@@ -255,3 +531,124 @@ Provide formatted, actionable notes:"""
             "used_llm": False,
             "error": error_msg,
         }
+
+
+def summarize_batch(texts: List[str]) -> List[dict]:
+    """
+    Format several notes with a single Ollama call.
+
+    Packing the batch into one prompt prefills the shared instructions once
+    instead of once per note, which keeps the model's KV cache hot across
+    items. The model is asked to emit an ---END NOTE k--- sentinel after
+    each formatted note; if the output can't be split back into exactly one
+    piece per input, the batch falls back to per-note summarize_for_pdf
+    calls, so correctness never depends on the model following instructions.
+
+    Args:
+        texts: Raw note contents, one per note
+
+    Returns:
+        One summarize_for_pdf-style result dict per input, in order
+    """
+    if not texts:
+        return []
+    if len(texts) == 1:
+        return [summarize_for_pdf(texts[0])]
+
+    model = get_best_available_model()
+    if not model:
+        return [summarize_for_pdf(t) for t in texts]
+
+    sections = "\n\n".join(
+        f"===NOTE {i}===\n{text}" for i, text in enumerate(texts, 1)
+    )
+
+    prompt = f"""You are an intelligent note assistant. For EACH note below:
+1. Fix typos and improve clarity
+2. Organize information logically with headers and bullet points
+3. Add critical insights and actionable items
+4. Preserve ALL original information
+
+Output each formatted note in clean markdown (# for headers, - for bullets,
+**bold** for key terms). After each formatted note, emit a line containing
+exactly ---END NOTE k--- where k is the note number.
+
+{sections}
+
+Formatted notes:"""
+
+    try:
+        logger.info(f"🤖 Using model '{model}' to format batch of {len(texts)} notes")
+
+        response = ollama.generate(
+            model=model,
+            prompt=prompt,
+            options={"temperature": 0.4, "top_p": 0.9},
+        )
+
+        pieces = [
+            p.strip()
+            for p in re.split(r"---END NOTE \d+---", response["response"])
+            if p.strip()
+        ]
+
+        if len(pieces) != len(texts):
+            logger.warning(
+                f"⚠️ Batch split mismatch ({len(pieces)} pieces for "
+                f"{len(texts)} notes), falling back to per-note calls"
+            )
+            return [summarize_for_pdf(t) for t in texts]
+
+        results = []
+        for text, formatted in zip(texts, pieces):
+            result = {
+                "formatted_text": formatted,
+                "success": True,
+                "used_llm": True,
+                "error": None,
+                "model_used": model,
+            }
+            _cache_put("summarize", text, result)
+            results.append(result)
+        return results
+
+    except Exception as e:
+        logger.error(f"❌ Batch formatting failed: {e}, falling back to per-note")
+        return [summarize_for_pdf(t) for t in texts]
+
+
+# --- Async offload -----------------------------------------------------------
+# A synchronous ollama call inside an async web handler blocks the event
+# loop for seconds. The pool is sized to the Ollama server's realistic
+# concurrency; the semaphore bounds queue depth so a burst of exports
+# fast-fails instead of piling requests onto a thrashing server.
+
+_LLM_POOL_WORKERS = 2
+_llm_pool = ThreadPoolExecutor(max_workers=_LLM_POOL_WORKERS, thread_name_prefix="llm")
+_llm_slots = threading.BoundedSemaphore(_LLM_POOL_WORKERS * 2)
+
+
+async def summarize_for_pdf_async(text: str, timeout: int = 30) -> dict:
+    """
+    Async wrapper for summarize_for_pdf that never blocks the event loop.
+
+    Runs the blocking Ollama call on a bounded worker pool. When the queue
+    is already full (pool workers busy plus one waiter each), returns a
+    failure dict immediately instead of stacking more load on the server.
+    """
+    if not _llm_slots.acquire(blocking=False):
+        logger.warning("LLM worker pool saturated, rejecting summarize request")
+        return {
+            "formatted_text": text,
+            "success": False,
+            "used_llm": False,
+            "error": "LLM busy, try again shortly",
+        }
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _llm_pool, lambda: summarize_for_pdf(text, timeout)
+        )
+    finally:
+        _llm_slots.release()
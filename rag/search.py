@@ -2,10 +2,15 @@
 RAG Search API - Interface for Backend to query vector store
 """
 import logging
+from functools import lru_cache
 from typing import Dict, List
 
+import numpy as np
+
 import rag.state as state
+from rag import answer_cache
 from rag.chunker import chunk_text
+from rag.embed_cache import encode_cached
 from rag.indexer import initialize_rag_system
 from rag.llm_client import synthesize_answer
 
@@ -18,19 +23,178 @@ logger = logging.getLogger(__name__)
 _initialized = False
 
 
+def _initialized_noop():
+    """Post-init stand-in for _ensure_initialized"""
+
+
 def _ensure_initialized():
-    """Ensure RAG system is initialized before use"""
-    global _initialized
+    """Ensure RAG system is initialized before use.
+
+    On first success this rebinds the module-level name to a no-op, so
+    every call after initialization pays a bare function call instead of
+    a global read plus branch - the uninitialized path is specialized
+    out of the steady state.
+    """
+    global _initialized, _ensure_initialized
     if not _initialized:
         logger.info("Initializing RAG system...")
         if initialize_rag_system():
             _initialized = True
+            _ensure_initialized = _initialized_noop
             logger.info("RAG system initialized successfully")
         else:
             logger.error("RAG system initialization failed")
             raise RuntimeError("RAG system is not initialized")
 
 
+@lru_cache(maxsize=2048)
+def _encode_query(query: str) -> tuple:
+    """Embed a (normalized) query string, memoized.
+
+    Retries, pagination, and "load more" all re-send the same query text;
+    a cache hit skips the whole BGE forward pass, which dominates search
+    latency on small collections. Returns a tuple so the result is
+    hashable and immutable. The cache never needs invalidation - it would
+    only go stale if the embedding model itself changed.
+    (state.normalize_vectors is fixed at init, before any query runs.)
+    """
+    return tuple(
+        state.model.encode(
+            [query], normalize_embeddings=state.normalize_vectors
+        )[0].tolist()
+    )
+
+
+# int8 vectors carry norm ~127, so inner products between them are
+# ~127^2 times the cosine of the underlying unit vectors
+_INT8_SCALE = 127.0
+
+
+def _int8_active() -> bool:
+    """True when the int8 storage path applies to the Chroma collection.
+
+    Requires an ip-space collection (state.normalize_vectors): ip
+    distance is 1 - dot, which is not scale-invariant, so the int8
+    scaling must be divided back out of the scores - _scores_from_
+    distances does that. Legacy l2 collections never quantize; their
+    squared distances would blow up the score contract with no way to
+    recover it.
+    """
+    return state.normalize_vectors and state.config.get("rag", {}).get(
+        "vector_int8", False
+    )
+
+
+def _maybe_quantize(embeddings: "np.ndarray") -> "np.ndarray":
+    """Optionally quantize embeddings to int8 for storage/query.
+
+    With rag.vector_int8 enabled (ip collections only), vectors are
+    L2-normalized and scaled to int8 - a quarter of the RAM and memory
+    bandwidth per HNSW distance computation. Both sides are quantized
+    identically, so ranking is preserved and the known ~127^2 scale on
+    the dot products is removed again at scoring time; the rounding
+    noise is far below retrieval resolution.
+    """
+    if not _int8_active():
+        return embeddings
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return np.round(embeddings / np.maximum(norms, 1e-12) * _INT8_SCALE).astype(
+        np.int8
+    )
+
+
+def _scores_from_distances(dists) -> List[float]:
+    """Convert raw query distances to the 0-1 similarity contract.
+
+    Chroma's ip distance is 1 - dot, so with unit-norm vectors
+    1 - distance is cosine similarity directly. On the int8 path both
+    stored and query vectors carry norm ~127, which scales the dots
+    (and thus 1 - distance) by ~127^2 - divide that back out. Scores
+    that still land outside [-1, 1] mean the stored vectors don't match
+    the current quantization/space settings (e.g. vector_int8 toggled
+    without a rebuild) and are worth a loud warning.
+    """
+    scores = 1.0 - np.asarray(dists)
+    if state.faiss_index is None and _int8_active():
+        scores = scores / (_INT8_SCALE * _INT8_SCALE)
+    out = scores.tolist()
+    if out and (max(out) > 1.01 or min(out) < -1.01):
+        logger.warning(
+            "Similarity scores outside [-1, 1] (min=%.3f, max=%.3f) - "
+            "stored vectors don't match the current vector_int8/space "
+            "settings; re-index the collection",
+            min(out),
+            max(out),
+        )
+    return out
+
+
+@lru_cache(maxsize=1024)
+def _query_cached(query_norm: str, n_results: int, scope: str, corpus_version: int):
+    """Run the Chroma query, memoized while the corpus is unchanged.
+
+    The HNSW traversal plus sqlite metadata joins are pure waste for a
+    repeated (query, top_k, scope) against an unchanged corpus.
+    corpus_version is state.corpus_version at call time - any
+    index/delete bumps it, so stale entries simply stop being hit.
+    Returns (documents, metadatas, distances) tuples for the top hits.
+    """
+    # FAISS hot path when the mirror is active: native HNSW with SIMD
+    # distance kernels, same (docs, metas, dists) contract
+    if state.faiss_index is not None:
+        docs, metas, dists = state.faiss_index.search(
+            np.asarray(_encode_query(query_norm), dtype=np.float32),
+            n_results,
+            class_code=None if scope == "all" else scope,
+        )
+        return tuple(docs), tuple(metas), tuple(dists)
+
+    query_params = {
+        # 2D ndarray, not list-of-list: Chroma takes it as-is, skipping
+        # per-float PyObject boxing
+        "query_embeddings": _maybe_quantize(
+            np.asarray([_encode_query(query_norm)], dtype=np.float32)
+        ),
+        "n_results": n_results,
+    }
+    if scope != "all":
+        query_params["where"] = {"class_code": scope}
+        logger.debug("Filtering by class: %s", scope)
+
+    results = state.collection.query(**query_params)
+    return (
+        tuple(results["documents"][0]),
+        tuple(results["metadatas"][0]),
+        tuple(results["distances"][0]),
+    )
+
+
+def _format_results(docs, metas, scores) -> List[Dict]:
+    """Build the API-contract result dicts from raw query output.
+
+    Deliberately lean: the append method is bound once, each meta field
+    is read once, and scores arrive as native floats (via ndarray
+    .tolist()), so the loop is down to dict construction and one
+    f-string per hit.
+    """
+    output = []
+    append = output.append
+    for doc, meta, score in zip(docs, metas, scores):
+        cls = meta.get("class_code", "unknown")
+        date = meta.get("date", "unknown")
+        append(
+            {
+                "chunk": doc,
+                "source": meta.get("filename", "unknown"),
+                "score": score,
+                "class_code": cls,
+                "date": date,
+                "citation": f"{cls} - {date}",
+            }
+        )
+    return output
+
+
 def search(query: str, top_k: int = 8, scope: str = "all") -> List[Dict]:
     """
     Semantic search in vector store.
@@ -59,51 +223,41 @@ def search(query: str, top_k: int = 8, scope: str = "all") -> List[Dict]:
             logger.error("Collection not initialized")
             return []
 
-        # Check if collection has any documents
-        if state.collection.count() == 0:
+        # Check if collection has any documents (cached size - no
+        # sqlite round-trip)
+        if state.collection_size == 0:
             logger.warning("Vector store is empty, no documents indexed")
             return []
 
-        # Encode the query
-        query_embedding = state.model.encode([query])[0]
+        # Normalize to uppercase for consistent matching
+        normalized_scope = scope.upper() if scope and scope != "all" else "all"
 
-        # Build query parameters
-        query_params = {
-            "query_embeddings": [query_embedding.tolist()],
-            "n_results": min(
-                top_k, state.collection.count()
-            ),  # Don't request more than available
-        }
+        # Execute query (memoized per corpus version; the query embedding
+        # is itself memoized inside _query_cached)
+        docs, metas, dists = _query_cached(
+            query.strip().lower(),
+            min(top_k, state.collection_size),  # Don't request more than available
+            normalized_scope,
+            state.corpus_version,
+        )
 
-        # Add scope filter if not "all"
-        if scope != "all" and scope:
-            # Normalize to uppercase for consistent matching
-            normalized_scope = scope.upper()
-            query_params["where"] = {"class_code": normalized_scope}
-            logger.debug(f"Filtering by class: {normalized_scope}")
-
-        # Execute query
-        results = state.collection.query(**query_params)
-
-        # Format results according to API contract
-        output = []
-        for i, (doc, meta, dist) in enumerate(
-            zip(
-                results["documents"][0],
-                results["metadatas"][0],
-                results["distances"][0],
-            )
-        ):
-            output.append(
-                {
-                    "chunk": doc,
-                    "source": meta.get("filename", "unknown"),
-                    "score": 1.0 - dist,  # Convert distance to similarity score
-                    "citation": f"{meta.get('class_code', 'unknown')} - {meta.get('date', 'unknown')}",
-                }
+        # Convert distances to similarity scores in one vectorized pass
+        # (including the int8 rescale when that path is active);
+        # .tolist() unboxes to native floats in C, so the formatting loop
+        # never touches numpy scalars
+        scores = _scores_from_distances(dists) if dists else []
+
+        # Format results according to API contract. class_code/date ride
+        # along as first-class fields so downstream grouping never has to
+        # re-parse them out of the citation string.
+        output = _format_results(docs, metas, scores)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Search completed: query='%s...', results=%d",
+                query[:50],
+                len(output),
             )
-
-        logger.info(f"Search completed: query='{query[:50]}...', results={len(output)}")
         return output
 
     except Exception as e:
@@ -145,13 +299,17 @@ def index_document(text: str, metadata: Dict) -> bool:
                 logger.error(f"Missing required metadata key: {key}")
                 return False
 
-        # Normalize class_code to uppercase for consistent filtering
-        metadata = metadata.copy()  # Don't modify original
+        # Keep chunk rows minimal: only the fields retrieval actually
+        # uses (scope filter, citations, deletes) are stored per chunk.
+        # Anything else a caller tacks on would be serialized into every
+        # chunk row and bloat the metadata index. None values are dropped
+        # too - ChromaDB doesn't accept them. class_code is uppercased
+        # for consistent filtering. (Doesn't modify the caller's dict.)
+        metadata = {
+            k: metadata[k] for k in required_keys if metadata[k] is not None
+        }
         metadata["class_code"] = metadata["class_code"].upper()
 
-        # Filter out None values - ChromaDB doesn't accept them
-        metadata = {k: v for k, v in metadata.items() if v is not None}
-
         # Chunk the text
         chunks = chunk_text(text)
 
@@ -159,40 +317,98 @@ def index_document(text: str, metadata: Dict) -> bool:
             logger.warning("No chunks generated from text")
             return False
 
-        logger.info(f"Chunking complete: {len(chunks)} chunks")
-
-        # Encode chunks
-        embeddings = state.model.encode(chunks)
-
-        # Generate unique IDs for each chunk
-        base_id = f"{metadata['class_code']}_{metadata['date']}_{metadata['filename']}"
-        ids = [f"{base_id}_chunk_{i}" for i in range(len(chunks))]
+        logger.info("Chunking complete: %d chunks", len(chunks))
 
-        # Delete existing document if it exists (handle re-uploads)
+        # Deterministic IDs keyed on filename alone: a re-upload of the
+        # same file (even with a corrected class/date) overwrites its
+        # previous chunks in place via upsert, with no existence probe
         filename = metadata["filename"]
+        ids = [f"{filename}_chunk_{i}" for i in range(len(chunks))]
+
+        # Rows indexed before this ID scheme carry different ids (and no
+        # _chunk_index), so upsert would leave them behind forever. Probe
+        # one new-scheme id: if it's absent this is the file's first
+        # upload under the new scheme, so pay the old filename scan once
+        # and collect any legacy rows for deletion after the upsert.
+        legacy_ids: List[str] = []
         try:
-            existing = state.collection.get(where={"filename": filename})
-            if existing["ids"]:
-                logger.info(
-                    f"🔄 Updating existing document: {filename} ({len(existing['ids'])} old chunks)"
+            probe = state.collection.get(ids=[ids[0]], include=[])
+            if not probe["ids"]:
+                existing = state.collection.get(
+                    where={"filename": filename}, include=[]
                 )
-                state.collection.delete(ids=existing["ids"])
+                new_ids = set(ids)
+                legacy_ids = [i for i in existing["ids"] if i not in new_ids]
         except Exception as e:
-            logger.debug(f"No existing document to delete: {e}")
-
-        # Add to collection (upsert behavior)
-        state.collection.add(
-            embeddings=embeddings.tolist(),
-            documents=chunks,
-            metadatas=[metadata] * len(chunks),
-            ids=ids,
-        )
+            logger.debug(f"Legacy-id probe failed: {e}")
+
+        # Encode and upsert in micro-batches so peak memory is one batch
+        # of vectors rather than the whole document's N x 384 matrix plus
+        # its mirror lists. 64 also sits in Chroma's batched-add sweet
+        # spot, and each slice goes through the content-addressed
+        # embedding cache (only unseen chunks reach the model). The
+        # ndarray is handed to Chroma directly - .tolist() would box
+        # every float into a PyObject for no benefit.
+        batch_size = 64
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start : start + batch_size]
+            embeddings = encode_cached(state.model, batch)
+            state.collection.upsert(
+                embeddings=_maybe_quantize(embeddings.astype(np.float32, copy=False)),
+                documents=batch,
+                metadatas=[
+                    {**metadata, "_chunk_index": start + j}
+                    for j in range(len(batch))
+                ],
+                ids=ids[start : start + batch_size],
+            )
+
+        # One-time cleanup of rows from the pre-upsert ID scheme
+        if legacy_ids:
+            state.collection.delete(ids=legacy_ids)
+            logger.info(
+                "Removed %d legacy-id chunks for %s", len(legacy_ids), filename
+            )
+
+        # If the previous version had more chunks than this one, delete
+        # the stale tail - a bounded predicate delete instead of the old
+        # full get(where={"filename": ...}) metadata scan on every upload
+        try:
+            state.collection.delete(
+                where={
+                    "$and": [
+                        {"filename": filename},
+                        {"_chunk_index": {"$gte": len(chunks)}},
+                    ]
+                }
+            )
+        except Exception as e:
+            logger.debug(f"No stale chunks to delete: {e}")
+
+        # Keep the FAISS mirror in step: tombstone any previous version
+        # of this file, then append the new chunks
+        if state.faiss_index is not None:
+            state.faiss_index.delete_by_filename(filename)
+            full_embeddings = encode_cached(state.model, chunks)  # cache hits
+            state.faiss_index.add(
+                full_embeddings,
+                chunks,
+                [{**metadata, "_chunk_index": i} for i in range(len(chunks))],
+            )
+            state.faiss_index.save()
+
+        # Upsert makes the net size change unknowable without a probe;
+        # one O(1) count() resyncs the cached size
+        state.collection_size = state.collection.count()
+        state.corpus_version += 1
 
         logger.info(
-            f"Document indexed successfully: "
-            f"file={metadata['filename']}, chunks={len(chunks)}, "
-            f"class={metadata['class_code']}"
+            "Document indexed successfully: file=%s, chunks=%d, class=%s",
+            metadata["filename"],
+            len(chunks),
+            metadata["class_code"],
         )
+        state.on_change.set()  # Wake the status updater
         return True
 
     except Exception as e:
@@ -227,7 +443,14 @@ def delete_document(filename: str) -> bool:
         # Delete all chunks
         chunk_count = len(results["ids"])
         state.collection.delete(ids=results["ids"])
-        logger.info(f"✅ Deleted {chunk_count} vectors for {filename}")
+        state.collection_size -= chunk_count
+        state.corpus_version += 1
+        if state.faiss_index is not None:
+            state.faiss_index.delete_by_filename(filename)
+            state.faiss_index.save()
+        answer_cache.invalidate_filename(filename)
+        logger.info("✅ Deleted %d vectors for %s", chunk_count, filename)
+        state.on_change.set()  # Wake the status updater
         return True
 
     except Exception as e:
@@ -251,7 +474,7 @@ def search_with_synthesis(query: str, top_k: int = 8, scope: str = "all") -> Dic
             "synthesized": bool (True if LLM was used)
         }
     """
-    # Get search results
+    # Get search results (cheap relative to synthesis)
     chunks = search(query, top_k=top_k, scope=scope)
 
     if not chunks:
@@ -261,8 +484,16 @@ def search_with_synthesis(query: str, top_k: int = 8, scope: str = "all") -> Dic
             "synthesized": False,
         }
 
+    # Repeat question over unchanged evidence: reuse the stored answer
+    # instead of paying for LLM synthesis again
+    cached = answer_cache.get(query, scope, chunks)
+    if cached is not None:
+        logger.info("Answer cache hit for search_with_synthesis")
+        return {"answer": cached, "citations": chunks, "synthesized": True}
+
     # Synthesize with LLM
     answer = synthesize_answer(query, chunks)
+    answer_cache.put(query, scope, chunks, answer)
 
     return {"answer": answer, "citations": chunks, "synthesized": True}
 
@@ -286,27 +517,14 @@ def search_with_categories(query: str, top_k: int = 8, scope: str = "all") -> Di
     """
     results = search(query, top_k, scope)
 
-    # Group by class
+    # Group by class and date in one pass. search() exposes both as
+    # result fields, so no citation parsing; setdefault does the
+    # contains-check and insert in a single dict lookup.
     by_class = {}
-    for r in results:
-        # Extract class from citation (format: "CLASS_CODE - date")
-        citation = r.get("citation", "")
-        cls = citation.split(" - ")[0] if " - " in citation else "Unknown"
-
-        if cls not in by_class:
-            by_class[cls] = []
-        by_class[cls].append(r)
-
-    # Group by date
     by_date = {}
     for r in results:
-        # Extract date from citation
-        citation = r.get("citation", "")
-        date = citation.split(" - ")[1] if " - " in citation else "Unknown"
-
-        if date not in by_date:
-            by_date[date] = []
-        by_date[date].append(r)
+        by_class.setdefault(r.get("class_code", "Unknown"), []).append(r)
+        by_date.setdefault(r.get("date", "Unknown"), []).append(r)
 
     logger.info(
         f"Categorized {len(results)} results into {len(by_class)} classes and {len(by_date)} dates"
@@ -337,7 +555,7 @@ def get_status() -> Dict:
 
         return {
             "model_loaded": state.model is not None,
-            "index_size": state.collection.count() if state.collection else 0,
+            "index_size": state.collection_size if state.collection else 0,
             "ready": state.model is not None and state.collection is not None,
         }
 
@@ -1,8 +1,28 @@
 """
 Shared state for RAG system - single source of truth
 """
+import os
+import threading
 from typing import Optional
 
+# Pin CPU threading before torch initializes its runtime: the defaults
+# can leave MKL/OpenMP at a single thread, serializing every matmul in
+# model.encode. One intra-op pool across all cores, no inter-op
+# parallelism (encode calls are already serialized by the batcher).
+_n_threads = os.cpu_count() or 4
+os.environ.setdefault("OMP_NUM_THREADS", str(_n_threads))
+os.environ.setdefault("MKL_NUM_THREADS", str(_n_threads))
+
+try:
+    import torch
+
+    torch.set_num_threads(_n_threads)
+    torch.set_num_interop_threads(1)
+except (ImportError, RuntimeError):
+    # RuntimeError: interop pool already started (e.g. re-import after
+    # torch has run work) - keep whatever configuration is live
+    pass
+
 from sentence_transformers import SentenceTransformer
 
 # Shared state - both indexer.py and search.py access these
@@ -10,3 +30,26 @@ model: Optional[SentenceTransformer] = None
 collection = None
 client = None
 config: dict = {}
+
+# Optional FAISS mirror of the collection (rag/faiss_index.py); None
+# means queries go through Chroma
+faiss_index = None
+
+# Whether embeddings are L2-normalized before storage/query. True for
+# collections created in ip space; set False at init for collections
+# that predate the ip-space tuning (Chroma's default l2 space with
+# unnormalized vectors), where normalizing only the new side would rank
+# legacy notes by vector norm
+normalize_vectors: bool = True
+
+# In-process mirror of collection.count(), maintained by
+# index_document/delete_document - saves two sqlite round-trips per query
+collection_size: int = 0
+
+# Monotonic counter bumped on every index/delete; retrieval caches key on
+# it so any corpus change invalidates them without scanning anything
+corpus_version: int = 0
+
+# Set by index_document/delete_document so the status updater can react
+# to real state changes instead of polling on a fixed interval
+on_change = threading.Event()
@@ -1,17 +1,255 @@
 """
 AI-powered title and date extraction from note content
 """
+import asyncio
+import hashlib
+import json
 import logging
+import os
 import re
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
 
 import ollama
 
-from rag.llm_client import get_best_available_model
+from rag.llm_client import (
+    _KEEP_ALIVE,
+    _prefix_token_estimate,
+    get_best_available_model,
+)
+
+# The combined date scan is a bounded multi-pattern alternation - ideal
+# for re2's linear-time DFA, which retires far fewer instructions per
+# byte than the stdlib's backtracking NFA on long (e.g. OCR'd) notes.
+# Optional: the stdlib engine is the fallback.
+try:
+    import re2 as _rx
+except ImportError:
+    _rx = re
+
+# Optional: bulk imports can push thousands of notes through the regex
+# fallback paths, where per-note Python dispatch dominates. pandas'
+# vectorized .str methods run that loop in compiled code; without it
+# the batch helpers fall back to plain comprehensions.
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
 
 logger = logging.getLogger(__name__)
 
+# Compiled once at import: re's internal cache is bounded and keyed by the
+# pattern string, so literal-pattern calls pay a lookup (plus lock) every
+# time - wasted work on bulk-import paths that title many notes in a row
+_CLEAN_RE = re.compile(r"[^a-zA-Z0-9\s]")
+_WS_RE = re.compile(r"\s+")
+
+# str.translate deletion table equivalent to _CLEAN_RE for ASCII input:
+# one C-loop table lookup per char instead of running the regex engine.
+# Non-ASCII titles (rare) still go through _CLEAN_RE, which also strips
+# accented letters a 128-entry table can't cover.
+_CLEAN_TRANS = str.maketrans(
+    "", "", "".join(ch for ch in map(chr, range(128)) if ch not in " \t\n\r\f\v" and not ch.isalnum())
+)
+_SENT_SPLIT_RE = re.compile(r"[.!?]\s+")
+_ISO_VALIDATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_DIGIT_RE = re.compile(r"\d")
+
+_MONTH_NAMES = (
+    r"January|February|March|April|May|June|July|August|September|October"
+    r"|November|December|Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec"
+)
+
+# All four date formats fused into one alternation so a single pass over
+# the text finds the first date in any format; four separate findall
+# passes scanned the whole note four times. The named group that matched
+# (m.lastgroup) selects the capture pattern below to split the hit into
+# its fields.
+_COMBINED_DATE_PATTERN = (
+    # ISO: 2025-09-15 | US: 09/15/2025 | September 15, 2025 | 15 September 2025
+    r"(?P<iso>\b\d{4}-\d{2}-\d{2}\b)"
+    r"|(?P<us>\b\d{1,2}/\d{1,2}/\d{4}\b)"
+    r"|(?P<month_name>\b(?:" + _MONTH_NAMES + r")\.?\s+\d{1,2},?\s+\d{4}\b)"
+    r"|(?P<reverse_month>\b\d{1,2}\s+(?:" + _MONTH_NAMES + r")\.?\s+\d{4}\b)"
+)
+_COMBINED_DATE_RE = _rx.compile(_COMBINED_DATE_PATTERN, _rx.IGNORECASE)
+# pandas' .str.extract needs a stdlib-compiled pattern (re2 objects
+# aren't accepted); identical pattern, shared when re2 is absent
+_COMBINED_DATE_STD = (
+    _COMBINED_DATE_RE if _rx is re else re.compile(_COMBINED_DATE_PATTERN, re.IGNORECASE)
+)
+
+# Prompts are split into a byte-identical system preamble (rules and
+# examples) and a small per-note user part. With the fixed block first,
+# llama.cpp can reuse the prefill KV state for the preamble across calls
+# (keep_alive keeps the model resident, num_keep retains the prefix);
+# inlining note text before the rules defeated that reuse entirely.
+
+_TITLE_SYSTEM = """You are a note-titling assistant. Generate a SHORT descriptive title for the notes the user provides.
+
+Rules:
+- NO special characters except spaces
+- NO quotes or punctuation
+- Title only, no explanation
+- Be specific and descriptive
+- Never exceed the maximum length the user states
+
+Examples:
+Notes: Reviewed integration by parts, worked five textbook problems, still shaky on choosing u and dv.
+Title: Integration By Parts Practice
+
+Notes: Standup - deploy slipped to Friday, blocked on staging API keys, Dana owns the rollback plan.
+Title: Deploy Slipped Blocked On Keys
+
+Notes: Lecture covered the causes of the 1929 crash: margin buying, bank failures, and the Fed's response.
+Title: Causes Of The 1929 Crash"""
+
+_TITLE_USER_TEMPLATE = """Maximum {max_chars} characters.
+
+Notes:
+{content}
+
+Title:"""
+
+_DATE_SYSTEM = """You extract dates from student notes. Return ONLY the date the notes were taken or refer to, in ISO format (YYYY-MM-DD).
+
+Rules:
+- Respond with the date alone: YYYY-MM-DD
+- No explanation, no other words
+- If no clear date is found, respond with "NONE"
+
+Examples:
+Notes: Chem lab writeup, experiment run October 3rd 2025.
+Date: 2025-10-03
+
+Notes: Ideas for the essay, no deadline yet.
+Date: NONE"""
+
+_DATE_USER_TEMPLATE = """Notes:
+{content}
+
+Date (YYYY-MM-DD only):"""
+
+_BATCH_SYSTEM = """You title student notes and extract their dates. The user provides several notes, each introduced by a [[NOTE i]] marker. Respond with a JSON array holding one object per note, in the same order, each with:
+- "title": a SHORT descriptive title - letters, numbers and spaces only, no punctuation, specific to that note
+- "date": the date the note was taken or refers to, as YYYY-MM-DD, or "NONE" if the note has no clear date
+
+Return ONLY the JSON array, nothing else."""
+
+# Constrained decoding: Ollama accepts a JSON schema as `format` and
+# masks invalid tokens during sampling, so the model *cannot* emit a
+# malformed date (or a chatty preamble) and generation stops as soon as
+# the pattern is complete - fewer decode tokens, no discarded outputs.
+# The response arrives as a JSON-encoded string; _unwrap_constrained
+# strips that layer. The post-hoc validators stay as the safety net for
+# servers too old to honor schema formats.
+_DATE_FORMAT_SCHEMA = {"type": "string", "pattern": r"^(NONE|\d{4}-\d{2}-\d{2})$"}
+
+
+def _title_format_schema(max_chars: int) -> dict:
+    return {"type": "string", "maxLength": max_chars, "pattern": "^[A-Za-z0-9 ]+$"}
+
+
+def _unwrap_constrained(raw: str) -> str:
+    """Schema-constrained responses are JSON strings; plain ones are not.
+
+    Early-stopped streams may cut the closing quote off, so a leading
+    quote that fails to parse as JSON is stripped manually."""
+    raw = raw.strip()
+    if raw.startswith('"'):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return raw.strip('"')
+    return raw
+
+
+# kind -> capture pattern applied to the matched substring only
+_DATE_CAPTURES = {
+    "iso": re.compile(r"(\d{4})-(\d{2})-(\d{2})"),
+    "us": re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})"),
+    "month_name": re.compile(
+        r"(" + _MONTH_NAMES + r")\.?\s+(\d{1,2}),?\s+(\d{4})", re.IGNORECASE
+    ),
+    "reverse_month": re.compile(
+        r"(\d{1,2})\s+(" + _MONTH_NAMES + r")\.?\s+(\d{4})", re.IGNORECASE
+    ),
+}
+
+
+# --- Result cache ------------------------------------------------------------
+# Title and date are pure functions of the note text, but re-indexing,
+# edit-save loops, and retry storms call them repeatedly for the same
+# content - each a 100ms-1s Ollama round-trip. Results are memoized in
+# small LRUs keyed by a BLAKE2b hash of the full text (hashing is
+# microseconds; holding the texts themselves as keys would pin whole
+# notes in memory).
+
+_CACHE_MAX = 1024
+_title_cache: "OrderedDict" = OrderedDict()
+_date_cache: "OrderedDict" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _content_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def _cache_get(cache: "OrderedDict", key):
+    """Return the hit as a 1-tuple, or None on miss (a date result can
+    legitimately be None, so the raw value can't signal a miss)"""
+    with _cache_lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return (cache[key],)
+    return None
+
+
+def _cache_put(cache: "OrderedDict", key, value):
+    with _cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > _CACHE_MAX:
+            cache.popitem(last=False)
+
+
+# --- Model routing -----------------------------------------------------------
+# Titles and dates are trivial 10-20 token completions, but running them
+# through the main synthesis model evicts its prefill KV cache between
+# user queries (and a title request queued behind a long synthesis adds
+# whole-model latency to a rename). OLLAMA_TITLE_MODEL pins these calls
+# to a small always-resident model, and OLLAMA_TITLE_HOST can point them
+# at a separate Ollama instance entirely. Both optional: unset, behavior
+# is unchanged.
+
+_TITLE_HOST = os.environ.get("OLLAMA_TITLE_HOST")
+_TITLE_MODEL = os.environ.get("OLLAMA_TITLE_MODEL")
+
+# Kill switch: force the heuristic fallback for every title, never
+# touching the LLM (useful on machines without Ollama, or for bulk
+# imports where round-trips dominate)
+_DISABLE_LLM_TITLES = os.environ.get("NOTETAKER_DISABLE_LLM_TITLES", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+_sync_client = None
+
+
+def _get_client():
+    """Sync Ollama client, bound to OLLAMA_TITLE_HOST when set"""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = ollama.Client(host=_TITLE_HOST) if _TITLE_HOST else ollama
+    return _sync_client
+
+
+def _resolve_model() -> Optional[str]:
+    return _TITLE_MODEL or get_best_available_model()
+
 
 def generate_title(text: str, max_chars: int = 35) -> str:
     """
@@ -27,60 +265,89 @@ def generate_title(text: str, max_chars: int = 35) -> str:
     if not text or not text.strip():
         return "Untitled Note"
 
-    # Truncate very long text for performance
-    content_preview = text[:500] if len(text) > 500 else text
+    key = (_content_key(text), max_chars)
+    hit = _cache_get(_title_cache, key)
+    if hit is not None:
+        return hit[0]
+
+    # Fallback-first: most notes open with a usable first line, and for
+    # those the LLM round-trip is pure overhead
+    fallback = _fallback_title(text, max_chars)
+    if _DISABLE_LLM_TITLES or _is_good_fallback(fallback, max_chars):
+        return fallback
 
-    # Try LLM first
+    # Try LLM for the notes the heuristic couldn't title well
     try:
-        model = get_best_available_model()
+        model = _resolve_model()
 
         if model:
             logger.info(f"🤖 Generating title with {model}...")
 
-            prompt = f"""Generate a SHORT descriptive title (max {max_chars} chars) for these notes.
-
-Rules:
-- NO special characters except spaces
-- NO quotes or punctuation
-- Title only, no explanation
-- Be specific and descriptive
-- Maximum {max_chars} characters
-
-Notes:
-{content_preview}
-
-Title:"""
-
-            response = ollama.generate(
+            # Truncate very long text for performance (only materialized
+            # once a model is actually going to see it)
+            content_preview = text[:500] if len(text) > 500 else text
+
+            # Streamed so we can hang up as soon as enough characters
+            # have arrived - the server stops decoding when the
+            # connection drops, saving tail tokens _clean_title would
+            # have discarded anyway
+            chunks = []
+            total = 0
+            for part in _get_client().generate(
                 model=model,
-                prompt=prompt,
-                options={"temperature": 0.3, "num_predict": 20},
-            )
-
-            title = response["response"].strip()
-
-            # Clean the title
+                system=_TITLE_SYSTEM,
+                prompt=_TITLE_USER_TEMPLATE.format(
+                    max_chars=max_chars, content=content_preview
+                ),
+                format=_title_format_schema(max_chars),
+                stream=True,
+                keep_alive=_KEEP_ALIVE,
+                options={
+                    "temperature": 0.3,
+                    # A 35-char title is ~10 tokens (plus the JSON quotes
+                    # from the constrained format); the old budget of 20
+                    # paid decode steps that _clean_title threw away
+                    "num_predict": 12,
+                    "stop": ["\n"],
+                    "num_keep": _prefix_token_estimate(_TITLE_SYSTEM),
+                },
+            ):
+                tok = part["response"]
+                chunks.append(tok)
+                total += len(tok)
+                if total >= max_chars + 10 or "\n" in tok:
+                    break
+
+            title = _unwrap_constrained("".join(chunks))
+
+            # Clean the title (a no-op for schema-constrained output)
             title = _clean_title(title, max_chars)
 
             if title and len(title) > 3:
                 logger.info(f"✅ Generated title: '{title}'")
+                _cache_put(_title_cache, key, title)
                 return title
 
     except Exception as e:
         logger.warning(f"⚠️ LLM title generation failed: {e}")
 
-    # Fallback: Extract from content
-    return _fallback_title(text, max_chars)
+    # Fallback: Extract from content (not cached - a later call may
+    # succeed with the LLM)
+    return fallback
 
 
 def _clean_title(title: str, max_chars: int) -> str:
     """Clean and validate generated title"""
-    # Remove quotes, extra whitespace
-    title = title.strip("\"'`")
-    title = " ".join(title.split())
+    # Remove quotes, extra whitespace (strip after the collapse so a
+    # leading newline can't survive as a leading space and break the
+    # word-boundary truncation below)
+    title = _WS_RE.sub(" ", title.strip("\"'`")).strip()
 
     # Remove special characters except spaces
-    title = re.sub(r"[^a-zA-Z0-9\s]", "", title)
+    if title.isascii():
+        title = title.translate(_CLEAN_TRANS)
+    else:
+        title = _CLEAN_RE.sub("", title)
 
     # Truncate if too long
     if len(title) > max_chars:
@@ -89,10 +356,18 @@ def _clean_title(title: str, max_chars: int) -> str:
     return title.strip()
 
 
+def _is_good_fallback(title: str, max_chars: int) -> bool:
+    """Cheap confidence check: does this heuristic title read well enough
+    to skip the LLM round-trip entirely?"""
+    return 10 <= len(title) <= max_chars and " " in title and not title.isnumeric()
+
+
 def _fallback_title(text: str, max_chars: int) -> str:
     """Generate fallback title from first line/sentence"""
-    # Try first line
-    first_line = text.split("\n")[0].strip()
+    # Try first line; find+slice instead of split so a multi-MB note
+    # doesn't get copied into a throwaway list of lines
+    newline = text.find("\n")
+    first_line = (text if newline < 0 else text[:newline]).strip()
 
     if first_line:
         clean = _clean_title(first_line, max_chars)
@@ -101,7 +376,7 @@ def _fallback_title(text: str, max_chars: int) -> str:
             return clean
 
     # Try first sentence
-    sentences = re.split(r"[.!?]\s+", text)
+    sentences = _SENT_SPLIT_RE.split(text)
     if sentences:
         clean = _clean_title(sentences[0], max_chars)
         if len(clean) > 3:
@@ -125,69 +400,63 @@ def extract_date_from_content(text: str) -> Optional[str]:
     if not text or not text.strip():
         return None
 
-    # Date patterns to search for
-    patterns = [
-        # ISO format: 2025-09-15
-        (r"\b(\d{4})-(\d{2})-(\d{2})\b", "iso"),
-        # US format: 09/15/2025 or 9/15/2025
-        (r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b", "us"),
-        # Month name: September 15, 2025 or Sept 15, 2025
-        (
-            r"\b(January|February|March|April|May|June|July|August|September|October|November|December|Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)\.?\s+(\d{1,2}),?\s+(\d{4})\b",
-            "month_name",
-        ),
-        # Reverse: 15 September 2025
-        (
-            r"\b(\d{1,2})\s+(January|February|March|April|May|June|July|August|September|October|November|December|Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)\.?\s+(\d{4})\b",
-            "reverse_month",
-        ),
-    ]
-
-    # Try regex patterns first
-    for pattern, format_type in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
-            date_str = _parse_date_match(matches[0], format_type)
-            if date_str:
-                logger.info(f"✅ Extracted date from regex: {date_str}")
-                return date_str
+    key = _content_key(text)
+    hit = _cache_get(_date_cache, key)
+    if hit is not None:
+        return hit[0]
+
+    # Try the fused regex first: one pass over the text, any format
+    date_str = _regex_date(text)
+    if date_str:
+        _cache_put(_date_cache, key, date_str)
+        return date_str
+
+    # The LLM only ever sees text[:300]; if that window has no digits
+    # there is no date to find, so skip the round-trip entirely
+    if not _DIGIT_RE.search(text, 0, 300):
+        logger.info("📅 No digits in content, skipping LLM date extraction")
+        _cache_put(_date_cache, key, None)
+        return None
 
     # Try LLM assistance for ambiguous dates
     try:
-        model = get_best_available_model()
+        model = _resolve_model()
 
         if model:
             logger.info("🤖 Using LLM to extract date...")
 
-            # Only send first 300 chars for efficiency
-            content_preview = text[:300]
-
-            prompt = f"""Extract the date from these notes. Return ONLY the date in ISO format (YYYY-MM-DD).
-
-If no clear date is found, respond with "NONE".
-
-Notes:
-{content_preview}
-
-Date (YYYY-MM-DD only):"""
-
-            response = ollama.generate(
+            # Only send first 300 chars for efficiency; streamed so the
+            # connection can be dropped once a full date has arrived
+            chunks = []
+            total = 0
+            for part in _get_client().generate(
                 model=model,
-                prompt=prompt,
-                options={"temperature": 0.1, "num_predict": 15},
-            )
-
-            result = response["response"].strip()
-
-            # Validate ISO format
-            if re.match(r"^\d{4}-\d{2}-\d{2}$", result):
-                # Verify it's a valid date
-                try:
-                    datetime.strptime(result, "%Y-%m-%d")
-                    logger.info(f"✅ LLM extracted date: {result}")
-                    return result
-                except ValueError:
-                    logger.warning(f"⚠️ LLM returned invalid date: {result}")
+                system=_DATE_SYSTEM,
+                prompt=_DATE_USER_TEMPLATE.format(content=text[:300]),
+                format=_DATE_FORMAT_SCHEMA,
+                stream=True,
+                keep_alive=_KEEP_ALIVE,
+                options={
+                    "temperature": 0.0,
+                    # YYYY-MM-DD (or NONE) is at most ~8 tokens quoted
+                    "num_predict": 10,
+                    "stop": ["\n"],
+                    "num_keep": _prefix_token_estimate(_DATE_SYSTEM),
+                },
+            ):
+                tok = part["response"]
+                chunks.append(tok)
+                total += len(tok)
+                # '"YYYY-MM-DD"' is 12 chars; 14 leaves quote slack
+                if total >= 14 or "\n" in tok:
+                    break
+
+            date_str = _validate_llm_date(_unwrap_constrained("".join(chunks)))
+            # Cache the verdict either way: a dateless note would
+            # otherwise pay the LLM round-trip again on every retry
+            _cache_put(_date_cache, key, date_str)
+            if date_str:
+                return date_str
 
     except Exception as e:
         logger.debug(f"LLM date extraction failed: {e}")
@@ -196,67 +465,446 @@ Date (YYYY-MM-DD only):"""
     return None
 
 
+def _regex_date(text: str) -> Optional[str]:
+    """First valid date in the text by position, in any supported format"""
+    for m in _COMBINED_DATE_RE.finditer(text):
+        format_type = m.lastgroup
+        groups = _DATE_CAPTURES[format_type].match(m.group(format_type)).groups()
+        date_str = _parse_date_match(groups, format_type)
+        if date_str:
+            logger.info(f"✅ Extracted date from regex: {date_str}")
+            return date_str
+    return None
+
+
+def _validate_llm_date(result: str) -> Optional[str]:
+    """Accept an LLM response only if it is a real ISO date"""
+    if _ISO_VALIDATE_RE.match(result):
+        try:
+            datetime.strptime(result, "%Y-%m-%d")
+            logger.info(f"✅ LLM extracted date: {result}")
+            return result
+        except ValueError:
+            logger.warning(f"⚠️ LLM returned invalid date: {result}")
+    return None
+
+
 def _parse_date_match(match: tuple, format_type: str) -> Optional[str]:
-    """Convert regex match to ISO date format"""
+    """Convert regex match to ISO date format
+
+    The datetime constructor is kept purely as the calendar validator
+    (it rejects Feb 30 etc.); the ISO string itself is built with an
+    f-string, skipping strftime's per-call format parsing.
+    """
     try:
         if format_type == "iso":
             year, month, day = match
-            date_obj = datetime(int(year), int(month), int(day))
-            return date_obj.strftime("%Y-%m-%d")
-
         elif format_type == "us":
             month, day, year = match
-            date_obj = datetime(int(year), int(month), int(day))
-            return date_obj.strftime("%Y-%m-%d")
-
         elif format_type == "month_name":
             month_str, day, year = match
-            month_num = _month_name_to_number(month_str)
-            if month_num:
-                date_obj = datetime(int(year), month_num, int(day))
-                return date_obj.strftime("%Y-%m-%d")
-
+            month = _month_name_to_number(month_str)
+            if not month:
+                return None
         elif format_type == "reverse_month":
             day, month_str, year = match
-            month_num = _month_name_to_number(month_str)
-            if month_num:
-                date_obj = datetime(int(year), month_num, int(day))
-                return date_obj.strftime("%Y-%m-%d")
+            month = _month_name_to_number(month_str)
+            if not month:
+                return None
+        else:
+            return None
+
+        year, month, day = int(year), int(month), int(day)
+        datetime(year, month, day)  # calendar validity check
+        return f"{year:04d}-{month:02d}-{day:02d}"
 
     except (ValueError, TypeError) as e:
         logger.debug(f"Date parsing failed: {e}")
         return None
 
-    return None
+
+# Built once at module scope (the per-call dict literal re-allocated 25
+# entries for every month candidate). Keyed on the first three letters:
+# every name and abbreviation _MONTH_NAMES can match shares a unique
+# 3-char prefix ("sept" included), so only that prefix gets lowercased.
+_MONTHS3 = {
+    "jan": 1,
+    "feb": 2,
+    "mar": 3,
+    "apr": 4,
+    "may": 5,
+    "jun": 6,
+    "jul": 7,
+    "aug": 8,
+    "sep": 9,
+    "oct": 10,
+    "nov": 11,
+    "dec": 12,
+}
 
 
 def _month_name_to_number(month_str: str) -> Optional[int]:
     """Convert month name/abbreviation to number"""
-    months = {
-        "january": 1,
-        "jan": 1,
-        "february": 2,
-        "feb": 2,
-        "march": 3,
-        "mar": 3,
-        "april": 4,
-        "apr": 4,
-        "may": 5,
-        "june": 6,
-        "jun": 6,
-        "july": 7,
-        "jul": 7,
-        "august": 8,
-        "aug": 8,
-        "september": 9,
-        "sep": 9,
-        "sept": 9,
-        "october": 10,
-        "oct": 10,
-        "november": 11,
-        "nov": 11,
-        "december": 12,
-        "dec": 12,
+    return _MONTHS3.get(month_str[:3].lower())
+
+
+# --- Batched title+date ------------------------------------------------------
+# Bulk imports used to pay 2N Ollama round-trips (HTTP, queueing, and a
+# fresh prefill of the system prompt each time). Packing K notes into
+# one call amortizes all of that: one round-trip, one shared prefix,
+# one JSON array back. K is bounded so the packed prompt stays well
+# inside the small models' context windows.
+
+_BATCH_K = 8
+
+
+def extract_dates_batch(texts: list) -> "list[Optional[str]]":
+    """
+    Regex-only date pass over many notes; never calls the LLM
+
+    With pandas installed the combined-pattern scan runs as one
+    vectorized .str.extract instead of N interpreted calls; hit rows
+    are then split and validated exactly like the scalar path.
+
+    Returns:
+        One ISO date string or None per input, in order
+    """
+    if pd is None or len(texts) < 32:
+        return [_regex_date(t) if t else None for t in texts]
+
+    hits = pd.Series(texts, dtype="object").fillna("").str.extract(_COMBINED_DATE_STD)
+    results = []
+    for i, text in enumerate(texts):
+        row = hits.iloc[i]
+        date_str = None
+        for format_type in _DATE_CAPTURES:
+            value = row[format_type]
+            if isinstance(value, str):
+                groups = _DATE_CAPTURES[format_type].match(value).groups()
+                date_str = _parse_date_match(groups, format_type)
+                if date_str is None:
+                    # First hit was an impossible date (e.g. 13/45/2025);
+                    # the scalar path keeps scanning, so defer to it
+                    date_str = _regex_date(text)
+                break
+        results.append(date_str)
+    return results
+
+
+def fallback_titles_batch(texts: list, max_chars: int = 35) -> "list[str]":
+    """
+    Vectorized _fallback_title over many notes; never calls the LLM
+
+    The common case (a usable first line) is computed with pandas .str
+    operations in one pass; rows that produce nothing usable drop to
+    the scalar fallback chain.
+    """
+    if pd is None or len(texts) < 32:
+        return [
+            _fallback_title(t, max_chars) if t and t.strip() else "Untitled Note"
+            for t in texts
+        ]
+
+    first_lines = (
+        pd.Series(texts, dtype="object")
+        .fillna("")
+        .str.split("\n", n=1)
+        .str[0]
+        .str.replace(_CLEAN_RE, "", regex=True)
+        .str.replace(_WS_RE, " ", regex=True)
+        .str.strip()
+    )
+    results = []
+    for text, candidate in zip(texts, first_lines):
+        if len(candidate) > max_chars:
+            candidate = candidate[:max_chars].rsplit(" ", 1)[0].strip()
+        if len(candidate) > 3:
+            results.append(candidate)
+        elif text and text.strip():
+            results.append(_fallback_title(text, max_chars))
+        else:
+            results.append("Untitled Note")
+    return results
+
+
+def _batch_format_schema(count: int, max_chars: int) -> dict:
+    return {
+        "type": "array",
+        "minItems": count,
+        "maxItems": count,
+        "items": {
+            "type": "object",
+            "properties": {
+                "title": _title_format_schema(max_chars),
+                "date": _DATE_FORMAT_SCHEMA,
+            },
+            "required": ["title", "date"],
+        },
     }
 
-    return months.get(month_str.lower())
+
+def generate_titles_and_dates(
+    texts: list, max_chars: int = 35
+) -> "list[Tuple[str, Optional[str]]]":
+    """
+    Generate titles and extract dates for many notes in batched LLM calls
+
+    Args:
+        texts: Note contents, one per note
+        max_chars: Maximum title length (default: 35)
+
+    Returns:
+        One (title, date) tuple per input, in order; date may be None
+    """
+    results: list = [None] * len(texts)
+    pending = []  # (position, text) pairs that actually need the LLM
+
+    # One (vectorized, when pandas is present) regex pass over the whole
+    # batch resolves most dates before any LLM work
+    regex_dates = extract_dates_batch(texts)
+
+    for i, text in enumerate(texts):
+        if not text or not text.strip():
+            results[i] = ("Untitled Note", None)
+            continue
+
+        title_hit = _cache_get(_title_cache, (_content_key(text), max_chars))
+        if title_hit is None:
+            # Fallback-first, like generate_title: a good first line
+            # keeps this note off the LLM batch for its title
+            fb = _fallback_title(text, max_chars)
+            if _DISABLE_LLM_TITLES or _is_good_fallback(fb, max_chars):
+                title_hit = (fb,)
+        date_key = _content_key(text)
+        date_hit = _cache_get(_date_cache, date_key)
+        # The regex pass is deterministic and cheap - resolve dates it
+        # found up front and cache them, so only the title (and truly
+        # ambiguous dates) ride on the LLM call
+        if date_hit is None and regex_dates[i]:
+            _cache_put(_date_cache, date_key, regex_dates[i])
+            date_hit = (regex_dates[i],)
+
+        if title_hit is not None and date_hit is not None:
+            results[i] = (title_hit[0], date_hit[0])
+        else:
+            pending.append((i, text))
+
+    if not pending:
+        return results
+
+    model = None
+    try:
+        model = _resolve_model()
+    except Exception as e:
+        logger.warning(f"⚠️ Model lookup failed: {e}")
+
+    for start in range(0, len(pending), _BATCH_K):
+        batch = pending[start : start + _BATCH_K]
+        parsed = None
+        if model:
+            try:
+                prompt = "\n\n".join(
+                    f"[[NOTE {j}]]\n{text[:400]}" for j, (_, text) in enumerate(batch)
+                )
+                logger.info(f"🤖 Batch titling {len(batch)} notes with {model}...")
+                response = _get_client().generate(
+                    model=model,
+                    system=_BATCH_SYSTEM,
+                    prompt=prompt,
+                    format=_batch_format_schema(len(batch), max_chars),
+                    keep_alive=_KEEP_ALIVE,
+                    options={
+                        "temperature": 0.3,
+                        "num_predict": 40 * len(batch),
+                        "num_keep": _prefix_token_estimate(_BATCH_SYSTEM),
+                    },
+                )
+                candidate = json.loads(response["response"])
+                if isinstance(candidate, list) and len(candidate) == len(batch):
+                    parsed = candidate
+                else:
+                    logger.warning("⚠️ Batch response shape mismatch, using fallbacks")
+            except Exception as e:
+                logger.warning(f"⚠️ Batch title/date generation failed: {e}")
+
+        for j, (pos, text) in enumerate(batch):
+            item = parsed[j] if parsed else None
+            title = None
+            date_str = None
+            if isinstance(item, dict):
+                title = _clean_title(str(item.get("title", "")), max_chars)
+                date_str = _validate_llm_date(str(item.get("date", "")).strip())
+
+            title_key = (_content_key(text), max_chars)
+            title_hit = _cache_get(_title_cache, title_key)
+            if title_hit is not None:
+                title = title_hit[0]
+            elif title and len(title) > 3:
+                _cache_put(_title_cache, title_key, title)
+            else:
+                title = _fallback_title(text, max_chars)
+
+            date_key = _content_key(text)
+            date_hit = _cache_get(_date_cache, date_key)
+            if date_hit is not None:
+                date_str = date_hit[0]
+            elif parsed is not None:
+                # The LLM rendered a verdict (possibly NONE) - cache it
+                # like the single-note path does
+                _cache_put(_date_cache, date_key, date_str)
+
+            results[pos] = (title, date_str)
+
+    return results
+
+
+# --- Async variants ----------------------------------------------------------
+# Title and date extraction are normally called back-to-back on the same
+# note, each a separate blocking Ollama round-trip. The async variants
+# let callers overlap the two requests (Ollama serves them concurrently
+# up to its OLLAMA_NUM_PARALLEL setting), roughly halving per-note
+# wall-clock on the LLM-assisted path.
+
+_async_client = None
+
+
+def _get_async_client() -> "ollama.AsyncClient":
+    global _async_client
+    if _async_client is None:
+        _async_client = (
+            ollama.AsyncClient(host=_TITLE_HOST) if _TITLE_HOST else ollama.AsyncClient()
+        )
+    return _async_client
+
+
+async def agenerate_title(text: str, max_chars: int = 35) -> str:
+    """Async variant of generate_title; same fallbacks, awaited LLM call"""
+    if not text or not text.strip():
+        return "Untitled Note"
+
+    key = (_content_key(text), max_chars)
+    hit = _cache_get(_title_cache, key)
+    if hit is not None:
+        return hit[0]
+
+    fallback = _fallback_title(text, max_chars)
+    if _DISABLE_LLM_TITLES or _is_good_fallback(fallback, max_chars):
+        return fallback
+
+    try:
+        model = _resolve_model()
+
+        if model:
+            logger.info(f"🤖 Generating title with {model}...")
+
+            content_preview = text[:500] if len(text) > 500 else text
+
+            chunks = []
+            total = 0
+            async for part in await _get_async_client().generate(
+                model=model,
+                system=_TITLE_SYSTEM,
+                prompt=_TITLE_USER_TEMPLATE.format(
+                    max_chars=max_chars, content=content_preview
+                ),
+                format=_title_format_schema(max_chars),
+                stream=True,
+                keep_alive=_KEEP_ALIVE,
+                options={
+                    "temperature": 0.3,
+                    # A 35-char title is ~10 tokens (plus the JSON quotes
+                    # from the constrained format); the old budget of 20
+                    # paid decode steps that _clean_title threw away
+                    "num_predict": 12,
+                    "stop": ["\n"],
+                    "num_keep": _prefix_token_estimate(_TITLE_SYSTEM),
+                },
+            ):
+                tok = part["response"]
+                chunks.append(tok)
+                total += len(tok)
+                if total >= max_chars + 10 or "\n" in tok:
+                    break
+
+            title = _clean_title(_unwrap_constrained("".join(chunks)), max_chars)
+
+            if title and len(title) > 3:
+                logger.info(f"✅ Generated title: '{title}'")
+                _cache_put(_title_cache, key, title)
+                return title
+
+    except Exception as e:
+        logger.warning(f"⚠️ LLM title generation failed: {e}")
+
+    return fallback
+
+
+async def aextract_date_from_content(text: str) -> Optional[str]:
+    """Async variant of extract_date_from_content"""
+    if not text or not text.strip():
+        return None
+
+    key = _content_key(text)
+    hit = _cache_get(_date_cache, key)
+    if hit is not None:
+        return hit[0]
+
+    date_str = _regex_date(text)
+    if date_str:
+        _cache_put(_date_cache, key, date_str)
+        return date_str
+
+    if not _DIGIT_RE.search(text, 0, 300):
+        logger.info("📅 No digits in content, skipping LLM date extraction")
+        _cache_put(_date_cache, key, None)
+        return None
+
+    try:
+        model = _resolve_model()
+
+        if model:
+            logger.info("🤖 Using LLM to extract date...")
+
+            chunks = []
+            total = 0
+            async for part in await _get_async_client().generate(
+                model=model,
+                system=_DATE_SYSTEM,
+                prompt=_DATE_USER_TEMPLATE.format(content=text[:300]),
+                format=_DATE_FORMAT_SCHEMA,
+                stream=True,
+                keep_alive=_KEEP_ALIVE,
+                options={
+                    "temperature": 0.0,
+                    # YYYY-MM-DD (or NONE) is at most ~8 tokens quoted
+                    "num_predict": 10,
+                    "stop": ["\n"],
+                    "num_keep": _prefix_token_estimate(_DATE_SYSTEM),
+                },
+            ):
+                tok = part["response"]
+                chunks.append(tok)
+                total += len(tok)
+                # '"YYYY-MM-DD"' is 12 chars; 14 leaves quote slack
+                if total >= 14 or "\n" in tok:
+                    break
+
+            date_str = _validate_llm_date(_unwrap_constrained("".join(chunks)))
+            _cache_put(_date_cache, key, date_str)
+            if date_str:
+                return date_str
+
+    except Exception as e:
+        logger.debug(f"LLM date extraction failed: {e}")
+
+    logger.info("📅 No date found in content")
+    return None
+
+
+async def atitle_and_date(text: str, max_chars: int = 35) -> Tuple[str, Optional[str]]:
+    """Generate title and extract date concurrently for one note"""
+    return tuple(
+        await asyncio.gather(
+            agenerate_title(text, max_chars), aextract_date_from_content(text)
+        )
+    )